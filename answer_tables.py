@@ -0,0 +1,158 @@
+import os
+import time
+from functools import lru_cache
+import numpy as np
+from domain_model import DEFAULT_TOLERANCE, project
+from formulas import compile_formula, normalise
+from misconceptions import SIGNATURE_RTOL, ErrorPattern
+from ontology_store import KEEP_VERSIONS, load_ontology, on_load
+from problem_bank import get_bank
+
+# Answer tables: for every problem in the bank, the interval of answers
+# accepted as correct (the formula's ontology tolerance around the exact
+# area, widened to cover π≈3.14) and the interval each modelled wrong method
+# would produce (the ontology's error signatures plus EXTRA_ERRORS). All
+# intervals are half-open, [lo, hi). Per problem they are stored as one
+# sorted row of edges, so checking a submission is a single binary search:
+#     odd insertion point k -> inside interval k // 2 -> its label
+# Label 0 means correct; the correct interval wins wherever intervals
+# overlap. Tables are rebuilt with every loaded version of the ontology.
+# Batch grading and utils.detect_misconceptions judge answers to arbitrary
+# dimensions with the same AnswerRules, one vectorized pass instead of a
+# table.
+ERROR_ONTOLOGY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "AreaTutorII.owl")
+APPROX_PI = 3.14
+
+# Wrong methods the ontology does not model
+EXTRA_ERRORS = {
+    "square": (("That's the perimeter, not the area", "4*s"),),
+    "rectangle": (
+        ("You added the length and width instead of multiplying them", "l+w"),
+        ("That's the perimeter, not the area", "2*(l+w)"),
+    ),
+    "triangle": (("You added the base and height instead of multiplying them", "b+h"),),
+    "parallelogram": (("You added the base and height instead of multiplying them", "b+h"),),
+    "trapezium": (("You added the sides and height instead of multiplying", "a+b+h"),),
+}
+
+def uses_pi(text):
+    return "pi" in normalise(text)
+
+def interval(values, with_pi, tolerance, rtol=0.0):
+    # [lo, hi) arrays around the values, also covering π≈3.14 if with_pi
+    low = high = values
+    if with_pi:
+        approx = values * (APPROX_PI / np.pi)
+        low, high = np.minimum(values, approx), np.maximum(values, approx)
+    width = np.maximum(tolerance, rtol * np.abs(values))
+    # The upper edge is the next float up, so hi itself is still inside
+    return low - width, np.nextafter(high + width, np.inf)
+
+def disjoint(intervals):
+    # [lo, hi) intervals in priority order -> sorted, non-overlapping
+    # (lo, hi, label); a lower-priority interval keeps only the parts no
+    # earlier one covers
+    kept = []
+    for lo, hi, label in intervals:
+        pieces = [(lo, hi)]
+        for k_lo, k_hi, _ in kept:
+            pieces = [p for a, b in pieces for p in ((a, min(b, k_lo)), (max(a, k_hi), b)) if p[0] < p[1]]
+        kept.extend((a, b, label) for a, b in pieces)
+    return sorted(kept)
+
+class AnswerRules:
+    # How answers for one shape are judged: the tolerance, whether π≈3.14 is
+    # accepted and the wrong methods a wrong answer is compared with
+    def __init__(self, shape, record=None):
+        # record: the shape's domain_model.Shape, if the ontology has one
+        formula = record.formula if record and record.formulas else None
+        self.with_pi = uses_pi(formula.expression) if formula else False
+        self.tolerance = formula.tolerance if formula else DEFAULT_TOLERANCE
+        # Only errors with a signature can be told apart by the answer
+        patterns = (record.patterns if record else ()) + tuple(
+            ErrorPattern(d, d, compile_formula(f)) for d, f in EXTRA_ERRORS.get(shape, ())
+        )
+        self.patterns = tuple(p for p in patterns if p.signature is not None)
+
+    def bounds(self, columns, expected):
+        # (labels, [(lo, hi) arrays per label]) for rows of dimension columns.
+        # A wrong method's interval is empty (NaN) on rows where it gives an
+        # accepted area, e.g. the perimeter of a 4 x 4 square.
+        patterns = [p for p in self.patterns if set(p.signature.variables) <= set(columns)]
+        lo, hi = interval(expected, self.with_pi, self.tolerance)
+        bounds = [(lo, hi)]
+        for p in patterns:
+            values = p.signature.batch(columns)
+            w_lo, w_hi = interval(values, uses_pi(p.signature.text), self.tolerance, SIGNATURE_RTOL)
+            same = (values >= lo) & (values < hi)
+            bounds.append((np.where(same, np.nan, w_lo), np.where(same, np.nan, w_hi)))
+        return (None,) + tuple(p.description for p in patterns), bounds
+
+    def judge(self, columns, expected, answers):
+        # Vectorized AnswerTable.check: (correct, descriptions) per row, where
+        # a wrong answer gets the wrong method it matches (the first one where
+        # several overlap) and an unmatched one gets none
+        labels, bounds = self.bounds(columns, expected)
+        answers = np.asarray(answers, dtype=float)
+        codes = np.full(len(answers), -1, dtype=np.int8)
+        for k in reversed(range(len(bounds))):
+            lo, hi = bounds[k]
+            codes[(answers >= lo) & (answers < hi)] = k
+        found = np.empty(len(labels) + 1, dtype=object)
+        found[:] = [()] + [(d,) for d in labels[1:]] + [()]
+        return codes == 0, found[codes]
+
+class AnswerTable:
+    def __init__(self, table, rules):
+        columns = {n: table.dims[:, i].astype(float) for i, n in enumerate(table.names)}
+        # The bank's expected areas are the reference
+        self.labels, bounds = rules.bounds(columns, table.expected)
+        rows = [
+            disjoint([(float(lo[i]), float(hi[i]), k) for k, (lo, hi) in enumerate(bounds)])
+            for i in range(len(table))
+        ]
+        # Pad to equal width with (inf, inf) pairs, which nothing falls into
+        width = max(len(r) for r in rows)
+        self.edges = np.full((len(rows), 2 * width), np.inf)
+        self.codes = np.zeros((len(rows), width), dtype=np.int8)
+        for i, r in enumerate(rows):
+            for j, (lo, hi, label) in enumerate(r):
+                self.edges[i, 2 * j:2 * j + 2] = lo, hi
+                self.codes[i, j] = label
+
+    def check(self, index, answer):
+        # (correct, description of the matched wrong method or None)
+        k = int(np.searchsorted(self.edges[index], answer, side="right"))
+        if k % 2 == 0:
+            return False, None
+        label = int(self.codes[index, k // 2])
+        return label == 0, self.labels[label]
+
+    def is_sorted(self):
+        # Every row of edges is non-decreasing, as searchsorted requires
+        return bool(np.all(self.edges[:, 1:] >= self.edges[:, :-1]))
+
+@lru_cache(maxsize=KEEP_VERSIONS)
+def rules_for(onto):
+    # shape key -> AnswerRules, for every bank shape and ontology shape
+    model = project(onto)
+    keys = list(get_bank().tables) + [s.key for s in model.shapes if s.key not in get_bank().tables]
+    return {key: AnswerRules(key, model.shape(key)) for key in keys}
+
+@lru_cache(maxsize=KEEP_VERSIONS)
+def tables_for(onto):
+    rules = rules_for(onto)
+    return {shape: AnswerTable(table, rules[shape]) for shape, table in get_bank().tables.items()}
+
+on_load(tables_for, path=ERROR_ONTOLOGY)
+
+def get_answer_tables(path=ERROR_ONTOLOGY, version=None):
+    return tables_for(load_ontology(path, version))
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    for shape, t in get_answer_tables().items():
+        # Out-of-order edges would make searchsorted misjudge boundaries
+        assert t.is_sorted(), f"{shape}: edges out of order"
+        print(f"{shape:<14} {len(t.edges):>4} problems, {len(t.labels) - 1} wrong methods")
+    print(f"built in {time.perf_counter() - start:.3f}s")
@@ -1,263 +1,115 @@
 import streamlit as st
-import random
-import os
-from math import pi
+import uuid
+import metrics
+from diagram_engine import render_html
+from event_log import shared_log
+from learner_store import shared_store
+from tutor import TutorSession
 
 # ==========================================================
 # CONFIG
 # ==========================================================
 st.set_page_config(page_title="Ontology-Powered Area ITS", layout="wide")
-SVG_DIR = "diagrams"
+rerun_started = metrics.clock()
 
-# ==========================================================
-# SESSION STATE INITIALISATION
-# ==========================================================
-if "student_mastery" not in st.session_state:
-    st.session_state.student_mastery = {
-        "square": 0,
-        "rectangle": 0,
-        "triangle": 0,
-        "parallelogram": 0,
-        "trapezium": 0,
-        "circle": 0
-    }
-
-if "current_shape" not in st.session_state:
-    st.session_state.current_shape = None
-
-if "displayed_problem" not in st.session_state:
-    st.session_state.displayed_problem = None
-
-if "feedback" not in st.session_state:
-    st.session_state.feedback = ""
-
-if "hint_level" not in st.session_state:
-    st.session_state.hint_level = 0
-
-if "answered" not in st.session_state:
-    st.session_state.answered = False
-
-if "initialized" not in st.session_state:
-    st.session_state.initialized = False
+# Hidden admin page: ?admin=metrics shows per-stage timings
+if st.query_params.get("admin") == "metrics":
+    st.code(metrics.render_prometheus(), language="text")
+    st.stop()
 
 # ==========================================================
-# PROBLEM GENERATION
-# ==========================================================
-def generate_problem(shape):
-    dims = {}
-    expected = 0.0
-
-    if shape == "square":
-        s = random.randint(3, 12)
-        dims = {"s": s}
-        expected = s * s
-
-    elif shape == "rectangle":
-        l = random.randint(5, 15)
-        w = random.randint(3, 10)
-        dims = {"l": l, "w": w}
-        expected = l * w
-
-    elif shape == "triangle":
-        b = random.randint(5, 15)
-        h = random.randint(3, 10)
-        dims = {"b": b, "h": h}
-        expected = 0.5 * b * h
-
-    elif shape == "parallelogram":
-        b = random.randint(5, 15)
-        h = random.randint(3, 10)
-        dims = {"b": b, "h": h}
-        expected = b * h
-
-    elif shape == "trapezium":
-        a = random.randint(4, 10)
-        b2 = random.randint(a + 2, a + 10)
-        h = random.randint(3, 10)
-        dims = {"a": a, "b": b2, "h": h}
-        expected = 0.5 * (a + b2) * h
-
-    elif shape == "circle":
-        r = random.randint(3, 10)
-        dims = {"r": r}
-        expected = pi * r * r
-
-    return {
-        "shape": shape,
-        "dims": dims,
-        "expected": round(expected, 2)
-    }
-
-# ==========================================================
-# LOAD NEW QUESTION
+# SESSION STATE INITIALISATION
 # ==========================================================
-def load_new_problem():
-    shape = min(
-        st.session_state.student_mastery,
-        key=lambda s: st.session_state.student_mastery[s]
+@st.cache_resource
+def stores():
+    # One learner store and event log per server process
+    return shared_store(), shared_log()
+
+learners, events = stores()
+
+# All tutoring logic lives in tutor.TutorSession; this script only draws it.
+# The learner id lives in the URL so a refresh keeps the same learner, and
+# ?seed=<n> replays a session's problems exactly.
+if "tutor" not in st.session_state:
+    learner_id = st.query_params.get("learner")
+    if not learner_id:
+        learner_id = uuid.uuid4().hex
+        st.query_params["learner"] = learner_id
+    seed = st.query_params.get("seed")
+    st.session_state.tutor = TutorSession(
+        learner_id,
+        learners.get(learner_id),
+        seed=int(seed) if seed else None,
+        learners=learners,
+        events=events
     )
+    st.session_state.tutor.load_new_problem()
 
-    st.session_state.current_shape = shape
-    st.session_state.displayed_problem = generate_problem(shape)
-    st.session_state.feedback = ""
-    st.session_state.hint_level = 0
-    st.session_state.answered = False
-
-if not st.session_state.initialized:
-    load_new_problem()
-    st.session_state.initialized = True
+tutor = st.session_state.tutor
 
 # ==========================================================
 # SVG DISPLAY WITH PROPORTIONAL LABEL FONT
 # ==========================================================
+@metrics.timed("display_svg")
 def display_svg(shape_name, dims):
-    import re
-    path = os.path.join(SVG_DIR, f"{shape_name}.svg")
-    if not os.path.exists(path):
+    # Templates and labelled output are cached by diagram_engine
+    container = render_html(shape_name, dims)
+    if container is None:
         st.write(f"SVG for {shape_name} not found")
         return
-    with open(path, "r") as f:
-        svg_content = f.read()
-
-    # Remove width/height attributes for scaling
-    svg_content = re.sub(r'width="[^"]+"', '', svg_content)
-    svg_content = re.sub(r'height="[^"]+"', '', svg_content)
-
-    # Fixed proportional font size
-    font_size = 12
-
-    labels = ""
-    if shape_name == "square":
-        s = dims['s']
-        labels += f'<text x="100" y="40" font-size="{font_size}" fill="black">s={s}</text>'
-    elif shape_name == "rectangle":
-        l, w = dims['l'], dims['w']
-        labels += f'<text x="125" y="25" font-size="{font_size}" fill="black">l={l}</text>'
-        labels += f'<text x="7" y="85" font-size="{font_size}" fill="black">w={w}</text>'
-    elif shape_name == "triangle":
-        b, h = dims['b'], dims['h']
-        labels += f'<text x="125" y="165" font-size="{font_size}" fill="black">b={b}</text>'
-        labels += f'<text x="130" y="95" font-size="{font_size}" fill="red">h={h}</text>'
-    elif shape_name == "parallelogram":
-        b, h = dims['b'], dims['h']
-        labels += f'<text x="125" y="165" font-size="{font_size}" fill="black">b={b}</text>'
-        labels += f'<text x="105" y="105" font-size="{font_size}" fill="red">h={h}</text>'
-    elif shape_name == "trapezium":
-        a, b_val, h = dims['a'], dims['b'], dims['h']
-        labels += f'<text x="125" y="40" font-size="{font_size}" fill="black">a={a}</text>'
-        labels += f'<text x="125" y="165" font-size="{font_size}" fill="black">b={b_val}</text>'
-        labels += f'<text x="130" y="105" font-size="{font_size}" fill="red">h={h}</text>'
-    elif shape_name == "circle":
-        r = dims['r']
-        labels += f'<text x="190" y="150" font-size="{font_size}" fill="red">r={r}</text>'
-
-    svg_content = svg_content.replace("</svg>", labels + "</svg>")
-
-    container = f'''
-    <div style="width:650px; overflow:auto; margin-bottom:20px;">
-        {svg_content}
-    </div>
-    '''
     st.components.v1.html(container, height=700)
 
 # ==========================================================
-# CHECK ANSWER
+# CALLBACKS
 # ==========================================================
 def check_answer(user_input):
-    if st.session_state.answered:
-        return
-    try:
-        user_input = float(user_input)
-    except:
-        st.session_state.feedback = "⚠️ Please enter a valid number."
-        return
-
-    expected = st.session_state.displayed_problem["expected"]
-    shape = st.session_state.current_shape
+    st.session_state.tutor.submit_answer(user_input)
 
-    if abs(user_input - expected) < 0.01:
-        st.session_state.feedback = "✅ Correct! Click **Next Question** to continue."
-        st.session_state.student_mastery[shape] = min(
-            100, st.session_state.student_mastery[shape] + 10
-        )
-        st.session_state.answered = True
-    else:
-        st.session_state.feedback = "❌ Incorrect. Try again or use a hint."
-
-# ==========================================================
-# NEXT QUESTION
-# ==========================================================
 def next_question():
-    if not st.session_state.answered:
-        return
-    load_new_problem()
+    st.session_state.tutor.next_problem()
 
-# ==========================================================
-# HINTS
-# ==========================================================
 def give_hint():
-    if st.session_state.answered:
-        return
-    st.session_state.hint_level += 1
-    shape = st.session_state.current_shape
-
-    if st.session_state.hint_level == 1:
-        st.session_state.feedback = f"💡 Recall the area formula for a {shape}."
-    elif st.session_state.hint_level == 2:
-        formulas = {
-            "square": "Area = side²",
-            "rectangle": "Area = length × width",
-            "triangle": "Area = ½ × base × height",
-            "parallelogram": "Area = base × height",
-            "trapezium": "Area = ½ × (a + b) × height",
-            "circle": "Area = π × r²"
-        }
-        st.session_state.feedback = f"📐 {formulas[shape]}"
-    else:
-        st.session_state.feedback = "No more hints."
+    st.session_state.tutor.hint()
 
 # ==========================================================
 # UI
 # ==========================================================
+# The question/feedback panel is a fragment: typing an answer, a hint or a
+# retry reruns only that panel. The whole page is redrawn only when
+# something outside it changes (mastery after a first attempt, or a new
+# problem for the diagram), detected by comparing with what was drawn.
+def drawn_state():
+    return tutor.count, tuple(tutor.mastery.values())
+
+st.session_state.drawn = drawn_state()
 st.title("📐 Ontology-Powered Intelligent Tutoring System")
 
 # ---------- SIDEBAR ----------
 with st.sidebar:
     st.subheader("📊 Mastery Levels")
-    for s, v in st.session_state.student_mastery.items():
-        colour = "🟥" if v < 50 else "🟨" if v < 85 else "🟩"
-        st.write(f"{s.capitalize():<15} {v}% {colour}")
-
-    st.subheader("🧑‍🏫 Feedback")
-    st.info(st.session_state.feedback or "Awaiting answer...")
+    st.markdown("  \n".join(
+        f"{s.capitalize():<15} {v:.0f}% {'🟥' if v < 50 else '🟨' if v < 85 else '🟩'}"
+        for s, v in tutor.mastery.items()
+    ))
 
 # ---------- MAIN ----------
 left, right = st.columns([1.2, 1.8])
 
-problem = st.session_state.displayed_problem
-dims = problem["dims"]
-shape = problem["shape"]
+@st.fragment
+@metrics.timed("tutor_panel")
+def tutor_panel():
+    if drawn_state() != st.session_state.get("drawn"):
+        st.rerun()
+    problem = tutor.problem
 
-with left:
     st.markdown("### Question")
 
-    if shape == "square":
-        st.write(f"Find the area of a square with side **{dims['s']}** units.")
-    elif shape == "rectangle":
-        st.write(f"Find the area of a rectangle with length **{dims['l']}** and width **{dims['w']}**.")
-    elif shape == "triangle":
-        st.write(f"Find the area of a triangle with base **{dims['b']}** and height **{dims['h']}**.")
-    elif shape == "parallelogram":
-        st.write(f"Find the area of a parallelogram with base **{dims['b']}** and height **{dims['h']}**.")
-    elif shape == "trapezium":
-        st.write(f"Find the area of a trapezium with bases **{dims['a']}**, **{dims['b']}** and height **{dims['h']}**.")
-    elif shape == "circle":
-        st.write(f"Find the area of a circle with radius **{dims['r']}**.")
+    st.write(problem["question"])
 
     answer = st.text_input(
         "Enter your answer:",
         key="answer_input",
-        disabled=st.session_state.answered
+        disabled=tutor.answered
     )
 
     b1, b2, b3 = st.columns(3)
@@ -266,24 +118,32 @@ with left:
             "Check Answer",
             on_click=check_answer,
             args=(answer,),
-            disabled=st.session_state.answered,
+            disabled=tutor.answered,
             key="btn_check"
         )
     with b2:
         st.button(
             "Hint",
             on_click=give_hint,
-            disabled=st.session_state.answered,
+            disabled=tutor.answered,
             key="btn_hint"
         )
     with b3:
         st.button(
             "Next Question",
             on_click=next_question,
-            disabled=not st.session_state.answered,
+            disabled=not tutor.answered,
             key="btn_next"
         )
 
+    st.markdown("### 🧑‍🏫 Feedback")
+    st.info(tutor.feedback or "Awaiting answer...")
+
+with left:
+    tutor_panel()
+
 with right:
     st.markdown("### Diagram")
-    display_svg(shape, dims)
+    display_svg(tutor.problem["shape"], tutor.problem["dims"])
+
+metrics.observe("rerun", metrics.clock() - rerun_started)
@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+import zlib
+import numpy as np
+import ontology_store
+from problem_selection import ONTOLOGY_PATH as GRAPH_ONTOLOGY
+from tutor import TutorSession
+
+# Load/latency benchmark for the tutor workflow. Each simulated learner runs
+#     load -> wrong answer -> hint -> right answer -> next
+# for a number of rounds, either against the headless TutorSession core
+# (default, fast) or through Streamlit's AppTest (--streamlit), which
+# re-executes the app script on every click exactly as the server does.
+# Results are written as JSON so runs on different commits can be diffed.
+APPS = {
+    "app.py": {},
+    "V2app.py": {"long_names": True, "ontology_path": GRAPH_ONTOLOGY},
+}
+ACTIONS = ("load", "wrong", "hint", "right", "next")
+
+def rss_mb():
+    # Current resident set size; ru_maxrss (peak) where /proc is missing
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def percentiles(samples):
+    ms = np.asarray(samples) * 1000
+    return {
+        "count": len(ms),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+def time_ontology_load(path):
+    ontology_store.clear_cache()
+    start = time.perf_counter()
+    ontology_store.load_ontology(path)
+    return time.perf_counter() - start
+
+# ------------------- DRIVERS -------------------
+class CoreDriver:
+    def __init__(self, app, learner):
+        self.options = APPS[app]
+        self.learner = learner
+
+    def load(self):
+        self.session = TutorSession(self.learner, seed=zlib.crc32(self.learner.encode()), **self.options)
+        self.session.load_new_problem()
+
+    def expected(self):
+        return self.session.problem["expected"]
+
+    def answer(self, value):
+        self.session.submit_answer(value)
+
+    def hint(self):
+        self.session.hint()
+
+    def next(self):
+        self.session.next_problem()
+
+class StreamlitDriver:
+    def __init__(self, app, learner):
+        self.app = os.path.abspath(app)
+        self.learner = learner
+
+    def load(self):
+        from streamlit.testing.v1 import AppTest
+        self.at = AppTest.from_file(self.app, default_timeout=60)
+        self.at.query_params["learner"] = self.learner
+        self.at.run()
+
+    def expected(self):
+        return self.at.session_state.tutor.problem["expected"]
+
+    def answer(self, value):
+        self.at.text_input(key="answer_input").input(str(value)).run()
+        self.at.button(key="btn_check").click().run()
+
+    def hint(self):
+        self.at.button(key="btn_hint").click().run()
+
+    def next(self):
+        self.at.button(key="btn_next").click().run()
+
+def run_learner(driver, rounds, timings):
+    def timed(action, func, *args):
+        start = time.perf_counter()
+        func(*args)
+        timings[action].append(time.perf_counter() - start)
+
+    timed("load", driver.load)
+    for _ in range(rounds):
+        timed("wrong", driver.answer, driver.expected() + 1)
+        timed("hint", driver.hint)
+        timed("right", driver.answer, driver.expected())
+        timed("next", driver.next)
+
+def bench_app(app, learners, rounds, streamlit):
+    driver_cls = StreamlitDriver if streamlit else CoreDriver
+    timings = {action: [] for action in ACTIONS}
+    rss = [(0, rss_mb())]
+
+    start = time.perf_counter()
+    for i in range(learners):
+        run_learner(driver_cls(app, f"bench-{i}"), rounds, timings)
+        rss.append((i + 1, rss_mb()))
+    elapsed = time.perf_counter() - start
+
+    actions = sum(len(t) for t in timings.values())
+    return {
+        "learners": learners,
+        "rounds": rounds,
+        "elapsed_s": elapsed,
+        "throughput_actions_per_s": actions / elapsed,
+        "latency": {action: percentiles(t) for action, t in timings.items() if t},
+        "rss_mb": rss,
+        "rss_growth_mb": rss[-1][1] - rss[0][1],
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the tutor workflow")
+    parser.add_argument("--apps", nargs="+", default=list(APPS), choices=list(APPS))
+    parser.add_argument("--learners", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--streamlit", action="store_true", help="drive the apps through AppTest")
+    parser.add_argument("--out", default="bench_results.json")
+    args = parser.parse_args()
+
+    if args.streamlit:
+        # Keep benchmark learners out of the real learner store
+        os.environ.setdefault("LEARNER_STORE", os.path.join(tempfile.mkdtemp(), "learners.sqlite3"))
+
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "mode": "streamlit" if args.streamlit else "core",
+        "ontology_load_s": {
+            path: time_ontology_load(path) for path in ("AreaTutorII.owl", "tstONt.owl")
+        },
+        "apps": {app: bench_app(app, args.learners, args.rounds, args.streamlit) for app in args.apps},
+    }
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+
+    for app, r in results["apps"].items():
+        print(f"{app}: {r['throughput_actions_per_s']:.0f} actions/s, RSS +{r['rss_growth_mb']:.1f} MB")
+        for action, stats in r["latency"].items():
+            print(f"  {action:<6} p50 {stats['p50_ms']:.2f} ms  p95 {stats['p95_ms']:.2f} ms  p99 {stats['p99_ms']:.2f} ms")
+    print("results written to", args.out)
+
+if __name__ == "__main__":
+    main()
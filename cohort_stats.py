@@ -0,0 +1,80 @@
+import warnings
+import numpy as np
+from knowledge_tracing import SHAPES
+from learner_store import DEFAULT_PATH, open_backend
+
+# Cohort-wide views of the learner store for the teacher dashboard. All
+# (learner, shape, score) rows are loaded in one query into a learners x
+# shapes float32 matrix of mastery percentages, NaN where a learner has not
+# attempted a shape yet, and every statistic is a whole-matrix NumPy
+# operation: no per-learner Python loop.
+MASTERED = 85.0
+AT_RISK = 40.0
+PERCENTILES = (10, 25, 50, 75, 90)
+BINS = 10
+
+class CohortMatrix:
+    def __init__(self, learners, shapes, scores):
+        learners = np.asarray(learners, dtype=str)
+        shapes = np.asarray(shapes, dtype=str)
+        self.learners, rows = np.unique(learners, return_inverse=True)
+        found, cols = np.unique(shapes, return_inverse=True)
+        # Known shapes first, in curriculum order, then any others
+        self.shapes = tuple(s for s in SHAPES if s in found) + tuple(s for s in found if s not in SHAPES)
+        order = {s: i for i, s in enumerate(self.shapes)}
+        cols = np.array([order[s] for s in found], dtype=np.int64)[cols] if len(found) else cols
+
+        self.p = np.full((len(self.learners), len(self.shapes)), np.nan, dtype=np.float32)
+        self.p[rows, cols] = np.asarray(scores, dtype=np.float32)
+        self.seen = ~np.isnan(self.p)
+
+    def __len__(self):
+        return len(self.learners)
+
+    def summary(self):
+        # shape -> (learners attempted, mean mastery, share mastered)
+        attempted = self.seen.sum(axis=0)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # shapes nobody tried
+            mean = np.nanmean(self.p, axis=0)
+        mastered = (self.p >= MASTERED).sum(axis=0) / np.maximum(attempted, 1)
+        return {s: (int(attempted[j]), float(mean[j]), float(mastered[j])) for j, s in enumerate(self.shapes)}
+
+    def percentiles(self, qs=PERCENTILES):
+        # len(qs) x shapes array over the learners who attempted each shape
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            return np.nanpercentile(self.p, qs, axis=0) if len(self) else np.full((len(qs), len(self.shapes)), np.nan)
+
+    def histograms(self, bins=BINS):
+        # bins x shapes counts of mastery in equal-width buckets of 0-100 %
+        idx = np.minimum((np.nan_to_num(self.p) * bins / 100).astype(np.int64), bins - 1)
+        flat = idx * len(self.shapes) + np.arange(len(self.shapes))
+        counts = np.bincount(flat[self.seen], minlength=bins * len(self.shapes))
+        return counts.reshape(bins, len(self.shapes))
+
+    def at_risk(self, threshold=AT_RISK, limit=50):
+        # Learners whose mean mastery over attempted shapes is below the
+        # threshold, weakest first: (learner, mean, weakest shape, its score)
+        attempted = self.seen.sum(axis=1)
+        mean = np.where(attempted > 0, np.nansum(self.p, axis=1) / np.maximum(attempted, 1), np.nan)
+        risky = np.flatnonzero(mean < threshold)
+        if not len(risky):
+            return []
+        if len(risky) > limit:
+            risky = risky[np.argpartition(mean[risky], limit)[:limit]]
+        risky = risky[np.argsort(mean[risky])]
+        weakest = np.argmin(np.where(self.seen[risky], self.p[risky], np.inf), axis=1)
+        return [
+            (str(self.learners[i]), float(mean[i]), self.shapes[j], float(self.p[i, j]))
+            for i, j in zip(risky.tolist(), weakest.tolist())
+        ]
+
+def load_matrix(path=DEFAULT_PATH):
+    backend = open_backend(path)
+    try:
+        rows = backend.load_all()
+    finally:
+        backend.close()
+    learners, shapes, scores = zip(*rows) if rows else ((), (), ())
+    return CohortMatrix(learners, shapes, scores)
@@ -0,0 +1,72 @@
+import streamlit as st
+import pandas as pd
+from cohort_stats import AT_RISK, BINS, PERCENTILES, load_matrix
+from learner_store import DEFAULT_PATH
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+# Teacher view over every learner in the learner store:
+#     streamlit run dashboard.py
+# The mastery matrix and its statistics are computed together and cached
+# for REFRESH seconds, and each panel is one table or chart call whatever
+# the number of learners.
+st.set_page_config(page_title="Area ITS - Cohort Dashboard", layout="wide")
+REFRESH = 30
+
+@st.cache_data(ttl=REFRESH, show_spinner=False)
+def cohort_view(path, threshold, limit):
+    m = load_matrix(path)
+    summary = pd.DataFrame.from_dict(
+        m.summary(), orient="index", columns=["learners", "mean %", "mastered"]
+    )
+    percentiles = pd.DataFrame(
+        m.percentiles().T, index=list(m.shapes), columns=[f"p{q}" for q in PERCENTILES]
+    )
+    histograms = pd.DataFrame(
+        m.histograms(), columns=list(m.shapes),
+        index=[f"{100 * i // BINS}-{100 * (i + 1) // BINS}%" for i in range(BINS)],
+    )
+    at_risk = pd.DataFrame(
+        m.at_risk(threshold, limit), columns=["learner", "mean %", "weakest shape", "weakest %"]
+    )
+    return len(m), summary, percentiles, histograms, at_risk
+
+# ==========================================================
+# CONTROLS
+# ==========================================================
+with st.sidebar:
+    st.subheader("⚙️ Settings")
+    threshold = st.slider("At-risk below (mean %)", 10, 80, int(AT_RISK), step=5)
+    limit = st.number_input("At-risk list length", 10, 1000, 50, step=10)
+    if st.button("Refresh now"):
+        cohort_view.clear()
+
+count, summary, percentiles, histograms, at_risk = cohort_view(DEFAULT_PATH, threshold, int(limit))
+
+# ==========================================================
+# PANELS
+# ==========================================================
+st.title("🧑‍🏫 Cohort Dashboard")
+if not count:
+    st.info("No learner has answered a question yet.")
+    st.stop()
+
+c1, c2, c3 = st.columns(3)
+c1.metric("Learners", f"{count:,}")
+c2.metric("Mean mastery", f"{summary['mean %'].mean():.0f}%")
+c3.metric("At risk", f"{len(at_risk):,}{'+' if len(at_risk) >= limit else ''}")
+
+left, right = st.columns([1, 1])
+with left:
+    st.markdown("### Mastery by shape")
+    st.dataframe(
+        summary.join(percentiles),
+        column_config={"mastered": st.column_config.ProgressColumn("mastered", min_value=0, max_value=1)}
+    )
+with right:
+    st.markdown("### Mastery distribution")
+    st.bar_chart(histograms)
+
+st.markdown(f"### At-risk learners (mean mastery below {threshold}%)")
+st.dataframe(at_risk, hide_index=True)
@@ -0,0 +1,93 @@
+import os
+import re
+import threading
+from functools import lru_cache
+import metrics
+
+# Diagram templates live in diagrams/<shape>.svg. Each label position is a
+# placeholder element in the template itself:
+#     <text data-dim="h" x="130" y="105" fill="red"/>
+# Templates are read and pre-split once (re-read only when the file's mtime
+# changes) and labelled output is memoised per (shape, dims).
+SVG_DIR = "diagrams"
+FONT_SIZE = 12
+
+# Long dimension names used by V2app.py -> label names used in the templates
+LABEL_ALIASES = {"side": "s", "length": "l", "width": "w", "base": "b", "height": "h", "radius": "r"}
+
+SLOT_RE = re.compile(r'<text\s+data-dim="(\w+)"([^>]*?)/>')
+ROOT_SIZE_RE = re.compile(r'(<svg\b[^>]*?)\s(?:width|height)="[^"]*"')
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+# ------------------- TEMPLATES -------------------
+def parse_template(svg):
+    # Strip width/height from the root element only so the diagram scales
+    while ROOT_SIZE_RE.search(svg):
+        svg = ROOT_SIZE_RE.sub(r"\1", svg, count=1)
+
+    # Alternate static text and (dim, attributes) slots
+    parts, pos = [], 0
+    for m in SLOT_RE.finditer(svg):
+        parts.append(svg[pos:m.start()])
+        parts.append((m.group(1), m.group(2)))
+        pos = m.end()
+    parts.append(svg[pos:])
+    return tuple(parts)
+
+def get_template(shape_name):
+    path = os.path.join(SVG_DIR, f"{shape_name}.svg")
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None, None
+    entry = _templates.get(path)
+    if entry is None or entry[0] != mtime:
+        with metrics.stage("svg_read"):
+            with open(path, "r") as f:
+                svg = f.read()
+        with metrics.stage("svg_parse"):
+            entry = (mtime, parse_template(svg))
+        with _templates_lock:
+            _templates[path] = entry
+    return entry
+
+# ------------------- RENDERING -------------------
+def label_values(dims):
+    return tuple(sorted((LABEL_ALIASES.get(k, k), v) for k, v in dims.items()))
+
+@lru_cache(maxsize=1024)
+@metrics.timed("svg_render")
+def _render(shape_name, mtime, labels):
+    parts = _templates[os.path.join(SVG_DIR, f"{shape_name}.svg")][1]
+    values = dict(labels)
+    out = []
+    for part in parts:
+        if isinstance(part, str):
+            out.append(part)
+        elif part[0] in values:
+            dim, attrs = part
+            out.append(f'<text{attrs} font-size="{FONT_SIZE}">{dim}={values[dim]}</text>')
+    return "".join(out)
+
+def render_svg(shape_name, dims):
+    # Labelled SVG markup, or None if there is no template for the shape
+    mtime, _ = get_template(shape_name)
+    if mtime is None:
+        return None
+    return _render(shape_name, mtime, label_values(dims))
+
+@lru_cache(maxsize=1024)
+def _render_html(shape_name, mtime, labels):
+    return f'''
+    <div style="width:650px; overflow:auto; margin-bottom:20px;">
+        {_render(shape_name, mtime, labels)}
+    </div>
+    '''
+
+def render_html(shape_name, dims):
+    mtime, _ = get_template(shape_name)
+    if mtime is None:
+        return None
+    return _render_html(shape_name, mtime, label_values(dims))
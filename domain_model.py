@@ -0,0 +1,123 @@
+from dataclasses import dataclass, field
+from functools import lru_cache
+from formulas import compiled_formula, formula_source
+from misconceptions import get_index, shape_key
+
+# Plain-object projection of a loaded ontology. Every owlready2 attribute
+# access is a quadstore query, so the ontology is walked once per loaded
+# World and the tutor's hot paths read these frozen, slotted records and
+# their dict indexes instead.
+DEFAULT_TOLERANCE = 0.01
+
+@dataclass(frozen=True, slots=True)
+class Hint:
+    name: str
+    iri: str
+    text: str
+
+@dataclass(frozen=True, slots=True)
+class ErrorType:
+    name: str
+    iri: str
+    description: str
+    signature: str | None
+
+@dataclass(frozen=True, slots=True)
+class Formula:
+    name: str
+    iri: str
+    expression: str
+    tolerance: float
+    hints: tuple
+    errors: tuple
+    compiled: object = field(compare=False, repr=False)
+
+@dataclass(frozen=True, slots=True)
+class Shape:
+    name: str
+    iri: str
+    key: str
+    formulas: tuple
+    patterns: tuple = field(compare=False, repr=False)
+
+    @property
+    def formula(self):
+        return self.formulas[0]
+
+@dataclass(frozen=True, slots=True)
+class Lesson:
+    name: str
+    iri: str
+    shapes: tuple
+    examples: tuple
+
+class DomainModel:
+    __slots__ = ("shapes", "lessons", "by_name", "by_iri", "lesson_for")
+
+    def __init__(self, shapes, lessons):
+        self.shapes = tuple(shapes)
+        self.lessons = tuple(lessons)
+        self.by_name = {}
+        self.by_iri = {}
+        for shape in self.shapes:
+            self.by_name[shape.name] = self.by_name[shape.key] = shape
+            self.by_iri[shape.iri] = shape
+            for formula in shape.formulas:
+                self.by_iri[formula.iri] = formula
+                for item in formula.hints + formula.errors:
+                    self.by_iri[item.iri] = item
+        # shape name -> first lesson illustrating it
+        self.lesson_for = {}
+        for lesson in self.lessons:
+            self.by_iri[lesson.iri] = lesson
+            for name in lesson.shapes:
+                self.lesson_for.setdefault(name, lesson)
+
+    def shape(self, ref):
+        # Accepts a Shape, its name or key ("triangle"), its IRI, or the
+        # owlready2 individual itself
+        if isinstance(ref, Shape):
+            return ref
+        if isinstance(ref, str):
+            return self.by_name.get(ref) or self.by_name.get(ref.lower()) or self.by_iri.get(ref)
+        return self.by_iri.get(getattr(ref, "iri", None))
+
+# ------------------- PROJECTION -------------------
+def _first(entity, prop, default=None):
+    values = getattr(entity, prop, None)
+    return values[0] if values else default
+
+def project_formula(formula):
+    hints = sorted(getattr(formula, "hasHint", []), key=lambda h: h.name)
+    errors = getattr(formula, "hasError", [])
+    return Formula(
+        formula.name, formula.iri, formula_source(formula),
+        _first(formula, "tolerance", DEFAULT_TOLERANCE),
+        tuple(Hint(h.name, h.iri, _first(h, "description", h.name)) for h in hints),
+        tuple(ErrorType(e.name, e.iri, _first(e, "errorDescription", e.name), _first(e, "errorSignature"))
+              for e in errors),
+        compiled_formula(formula),
+    )
+
+@lru_cache(maxsize=8)
+def project(onto):
+    index = get_index(onto)
+    shapes = []
+    for shape in onto.Shape.instances():
+        key = shape_key(shape)
+        shapes.append(Shape(
+            shape.name, shape.iri, key,
+            tuple(project_formula(f) for f in getattr(shape, "hasFormula", [])),
+            index.get(key, ()),
+        ))
+
+    # Only some ontologies model lessons
+    lessons = []
+    if onto.Lesson is not None:
+        for lesson in onto.Lesson.instances():
+            lessons.append(Lesson(
+                lesson.name, lesson.iri,
+                tuple(s.name for s in getattr(lesson, "illustratesShape", [])),
+                tuple(e.name for e in getattr(lesson, "hasExample", [])),
+            ))
+    return DomainModel(shapes, lessons)
@@ -0,0 +1,149 @@
+import argparse
+import glob
+import gzip
+import json
+import os
+import time
+from collections import Counter
+from write_behind import WriteBehind, shared
+
+# Append-only log of tutoring events, one compact JSON object per line:
+#     {"ts":1760781600.123,"ev":"check_answer","learner":"...","shape":"circle",
+#      "ok":false,"ans":18.85,"mis":"That's the circumference...","first":true,"p":13.2}
+# Events are buffered and appended every few seconds by a daemon thread
+# (write_behind.py). When the live file passes MAX_BYTES it is renamed to a
+# timestamped segment and gzipped. The readers below stream the segments in
+# order, so a months-long log is processed in memory bounded by the number
+# of shapes, misconceptions and learners, not by the length of the log.
+DEFAULT_PATH = os.environ.get("TUTOR_EVENTS", "events.jsonl")
+MAX_BYTES = 64 * 2 ** 20
+FLUSH_INTERVAL = 2.0
+MAX_PENDING = 1000
+MAX_BUFFERED = 100_000  # events kept while writes fail; older ones are dropped
+MASTERED = 85.0  # mastery percentage counted as mastered
+
+class EventLog(WriteBehind):
+    def __init__(self, path=DEFAULT_PATH, max_bytes=MAX_BYTES, flush_interval=FLUSH_INTERVAL,
+                 max_pending=MAX_PENDING, max_buffered=MAX_BUFFERED):
+        self.path = path
+        self.max_bytes = max_bytes
+        super().__init__(flush_interval, max_pending, max_buffered)
+
+    def record(self, event, **fields):
+        self.add(json.dumps({"ts": round(time.time(), 3), "ev": event, **fields},
+                            separators=(",", ":"), ensure_ascii=False))
+
+    def write(self, batch):
+        # Reopened per batch so a rotation by another worker process is
+        # picked up; O_APPEND keeps each batch's lines contiguous
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(batch) + "\n")
+            size = f.tell()
+        if size >= self.max_bytes:
+            try:
+                self.rotate()
+            except OSError as e:
+                # The batch is written; rotation is retried after the next one
+                print("Event log rotation failed:", repr(e))
+
+    def rotate(self):
+        now = time.time()
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(now)) + f"{now % 1:.6f}"[1:]
+        segment = f"{self.path}.{stamp}-{os.getpid()}"
+        try:
+            os.replace(self.path, segment)
+        except FileNotFoundError:
+            return  # another process rotated it first
+        with open(segment, "rb") as src, gzip.open(segment + ".gz", "wb") as dst:
+            while chunk := src.read(2 ** 20):
+                dst.write(chunk)
+        os.remove(segment)
+
+def shared_log(path=DEFAULT_PATH):
+    return shared(EventLog, path)
+
+# ------------------- READING -------------------
+def segments(path=DEFAULT_PATH):
+    # Rotated segments oldest first, then the live file
+    found = sorted(glob.glob(glob.escape(path) + ".*.gz"))
+    if os.path.exists(path):
+        found.append(path)
+    return found
+
+def read_events(path=DEFAULT_PATH):
+    for segment in segments(path):
+        opener = gzip.open if segment.endswith(".gz") else open
+        with opener(segment, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash
+
+def error_rates(events):
+    # Yields (shape, attempts, errors, first-attempt error rate) per shape
+    # once the stream is exhausted
+    counts = {}
+    for e in events:
+        if e["ev"] == "check_answer":
+            c = counts.setdefault(e["shape"], [0, 0, 0, 0])
+            c[0] += 1
+            c[1] += not e["ok"]
+            if e.get("first"):
+                c[2] += 1
+                c[3] += not e["ok"]
+    for shape, (attempts, errors, first, first_errors) in sorted(counts.items()):
+        yield shape, attempts, errors, first_errors / first if first else 0.0
+
+def misconception_counts(events):
+    # Yields ((shape, misconception), count), most frequent first
+    counts = Counter((e["shape"], e["mis"]) for e in events
+                     if e["ev"] == "check_answer" and e.get("mis"))
+    yield from counts.most_common()
+
+def time_to_mastery(events, threshold=MASTERED):
+    # Yields (learner, shape, seconds, attempts) as each learner first
+    # reaches the threshold on a shape; state is per (learner, shape)
+    started = {}
+    done = set()
+    for e in events:
+        if e["ev"] != "check_answer" or not e.get("first"):
+            continue
+        key = (e["learner"], e["shape"])
+        if key in done:
+            continue
+        start, attempts = started.get(key, (e["ts"], 0))
+        attempts += 1
+        if e["p"] >= threshold:
+            started.pop(key, None)
+            done.add(key)
+            yield key[0], key[1], e["ts"] - start, attempts
+        else:
+            started[key] = (start, attempts)
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise a tutor event log")
+    parser.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    parser.add_argument("--threshold", type=float, default=MASTERED)
+    args = parser.parse_args()
+
+    print("shape          attempts  errors  first-attempt error rate")
+    for shape, attempts, errors, rate in error_rates(read_events(args.path)):
+        print(f"{shape:<14} {attempts:>8} {errors:>7}  {rate:.1%}")
+
+    print("\nmisconceptions")
+    for (shape, mis), count in misconception_counts(read_events(args.path)):
+        print(f"{count:>8}  {shape}: {mis}")
+
+    print("\ntime to mastery")
+    totals = {}
+    for _, shape, seconds, attempts in time_to_mastery(read_events(args.path), args.threshold):
+        t = totals.setdefault(shape, [0, 0.0, 0])
+        t[0] += 1
+        t[1] += seconds
+        t[2] += attempts
+    for shape, (learners, seconds, attempts) in sorted(totals.items()):
+        print(f"{shape:<14} {learners:>6} learners  mean {seconds / learners / 60:.1f} min, {attempts / learners:.1f} problems")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import csv
+import os
+import sys
+import numpy as np
+from answer_tables import rules_for
+from domain_model import project
+from knowledge_tracing import Cohort, params_from_ontology
+from ontology_store import load_ontology
+
+# Headless batch grading for whole-class answer sheets. A sheet is columnar:
+# "student", "shape" and "answer" columns plus one column per formula
+# variable (s, l, w, b, h, a, r, base, height for AreaTutorII.owl), empty
+# where a variable does not apply to the row's shape. Rows are graded
+# vectorized, one NumPy pass per shape. A row whose area cannot be computed
+# (unknown shape, missing variable) is ungradable: NaN expected, not
+# correct, and left out of knowledge tracing.
+ONTOLOGY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "AreaTutorII.owl")
+
+# Variables AreaTutorII.owl spells out that the problem bank and the tutor
+# abbreviate; a sheet may use either name
+ALIASES = (("base", "b"), ("height", "h"))
+
+# ------------------- SHAPE TABLE -------------------
+def shape_table(onto):
+    # shape key -> (compiled formula, answer rules), read from the cached
+    # projection (domain_model.py); answers are judged like the tutor's
+    # (see answer_tables.py)
+    rules = rules_for(onto)
+    return {shape.key: (shape.formula.compiled, rules[shape.key])
+            for shape in project(onto).shapes if shape.formulas}
+
+# ------------------- GRADING -------------------
+def sheet_columns(sheet, rows):
+    # Formula variables for rows, each also under its alias; NaN where the
+    # sheet gives neither name
+    columns = {v: np.asarray(sheet[v], dtype=float)[rows] for v in sheet if v not in ("student", "shape", "answer")}
+    for long, short in ALIASES:
+        for name, other in ((long, short), (short, long)):
+            if other in columns:
+                found = columns.get(name, np.full(len(rows), np.nan))
+                columns[name] = np.where(np.isnan(found), columns[other], found)
+    return columns
+
+def grade_batch(sheet, onto=None):
+    onto = onto or load_ontology(ONTOLOGY_PATH)
+    shapes = np.asarray(sheet["shape"]).astype(str)
+    answers = np.asarray(sheet["answer"], dtype=float)
+    n = len(shapes)
+
+    expected = np.full(n, np.nan)
+    correct = np.zeros(n, dtype=bool)
+    misconceptions = np.empty(n, dtype=object)
+    misconceptions.fill(())
+
+    table = shape_table(onto)
+    for name in np.unique(shapes):
+        if name not in table:
+            continue
+        formula, rules = table[name]
+        rows = np.flatnonzero(shapes == name)
+        columns = sheet_columns(sheet, rows)
+        if not set(formula.variables) <= set(columns):
+            continue  # the sheet lacks a variable: every row is ungradable
+        values = np.round(formula.batch(columns), 2)
+        # Rows missing a variable stay ungradable: NaN expected, not correct
+        ok = ~np.isnan(values)
+        rows, values = rows[ok], values[ok]
+        columns = {v: c[ok] for v, c in columns.items()}
+        expected[rows] = values
+        correct[rows], misconceptions[rows] = rules.judge(columns, values, answers[rows])
+
+    # Replay the gradable rows through knowledge tracing, in row order per
+    # student
+    mastery_delta = np.zeros(n, dtype=np.float32)
+    known = ~np.isnan(expected)
+    if "student" in sheet and known.any():
+        students = np.asarray(sheet["student"]).astype(str)
+        mastery_delta[known] = Cohort(params_from_ontology(onto)).replay(
+            students[known], shapes[known], correct[known].astype(int)
+        )
+
+    return {
+        "expected": expected,
+        "correct": correct,
+        "mastery_delta": mastery_delta,
+        "misconceptions": misconceptions,
+    }
+
+# ------------------- SHEET I/O -------------------
+def read_sheet(path):
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet answer sheets requires pyarrow") from None
+        table = pq.read_table(path)
+        return {name: table.column(name).to_numpy(zero_copy_only=False) for name in table.column_names}
+
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    header, rows = rows[0], rows[1:]
+    columns = {}
+    for i, name in enumerate(header):
+        values = [row[i] for row in rows]
+        if name in ("student", "shape"):
+            columns[name] = np.array(values)
+        else:
+            columns[name] = np.array([float(v) if v.strip() else np.nan for v in values])
+    return columns
+
+def write_results(path, sheet, result):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        out = csv.writer(f)
+        out.writerow(["student", "shape", "answer", "expected", "correct", "mastery_delta", "misconceptions"])
+        for row in zip(sheet["student"], sheet["shape"], sheet["answer"], result["expected"],
+                       result["correct"], result["mastery_delta"], result["misconceptions"]):
+            out.writerow(row[:6] + ("; ".join(row[6]),))
+
+if __name__ == "__main__":
+    sheet = read_sheet(sys.argv[1])
+    result = grade_batch(sheet)
+    if len(sys.argv) > 2:
+        write_results(sys.argv[2], sheet, result)
+    ungradable = int(np.isnan(result["expected"]).sum())
+    print(f"graded {len(result['correct']) - ungradable} rows, {int(result['correct'].sum())} correct, "
+          f"{ungradable} ungradable")
@@ -0,0 +1,60 @@
+import os
+from functools import lru_cache
+from domain_model import project
+from ontology_store import load_ontology, on_load
+
+# Hint ladders built from the ontology's hasHint individuals (AreaTutorII.owl
+# carries e.g. TriangleHint1, TriangleHint2). Each shape's ladder is
+#     nudge -> ontology hints in order -> "No more hints."
+# and is precomputed once per loaded ontology, so asking for a hint is a
+# tuple index. When the learner's last wrong answer matched a modelled
+# error, that error's description is shown before the ladder continues.
+HINT_ONTOLOGY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "AreaTutorII.owl")
+NO_MORE_HINTS = "No more hints."
+
+# Used for shapes whose formula has no hasHint individuals
+FORMULA_HINTS = {
+    "square": "Area = side²",
+    "rectangle": "Area = length × width",
+    "triangle": "Area = ½ × base × height",
+    "parallelogram": "Area = base × height",
+    "trapezium": "Area = ½ × (a + b) × height",
+    "circle": "Area = π × r²"
+}
+
+class HintEngine:
+    def __init__(self, model):
+        self.model = model
+        self.ladders = {}
+        for shape in model.shapes:
+            texts = tuple(h.text for f in shape.formulas for h in f.hints)
+            if not texts and shape.key in FORMULA_HINTS:
+                texts = (FORMULA_HINTS[shape.key],)
+            self.ladders[shape.key] = (
+                (f"💡 Recall the area formula for a {shape.key}.",)
+                + tuple(f"📐 {t}" for t in texts)
+            )
+        for key, text in FORMULA_HINTS.items():
+            self.ladders.setdefault(key, (f"💡 Recall the area formula for a {key}.", f"📐 {text}"))
+
+    def hint(self, shape, level):
+        # Hint for 1-based level, or NO_MORE_HINTS past the end of the ladder
+        ladder = self.ladders.get(shape, ())
+        return ladder[level - 1] if 0 < level <= len(ladder) else NO_MORE_HINTS
+
+    def next_hint(self, shape, level, misconception=None):
+        # (text, new level): a detected misconception first, then the ladder
+        if misconception:
+            return f"🔎 {misconception}", level
+        return self.hint(shape, level + 1), level + 1
+
+@lru_cache(maxsize=8)
+def engine_for(model):
+    return HintEngine(model)
+
+@on_load(path=HINT_ONTOLOGY)
+def build_engine(onto):
+    return engine_for(project(onto))
+
+def get_engine(path=HINT_ONTOLOGY, version=None):
+    return build_engine(load_ontology(path, version))
@@ -0,0 +1,113 @@
+import os
+from functools import lru_cache
+import numpy as np
+from ontology_store import KEEP_VERSIONS, load_ontology, on_load
+
+# Bayesian Knowledge Tracing. Each shape is one skill with four parameters
+# read from the ontology's shape individuals: prior mastery, learn rate,
+# slip and guess. P(mastered) is updated from each first attempt at a
+# problem. A correct answer given after a hint counts as incorrect evidence,
+# the usual convention for hint-assisted responses.
+ONTOLOGY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "AreaTutorII.owl")
+SHAPES = ("square", "rectangle", "triangle", "parallelogram", "trapezium", "circle")
+DEFAULT_PARAMS = {"init": 0.1, "learn": 0.2, "slip": 0.1, "guess": 0.05}
+ONTOLOGY_PROPS = {"init": "bktPriorMastery", "learn": "bktLearnRate", "slip": "bktSlip", "guess": "bktGuess"}
+
+INCORRECT, CORRECT, HINTED = 0, 1, 2
+
+class BKTParams:
+    def __init__(self, shapes, init, learn, slip, guess):
+        self.shapes = tuple(shapes)
+        self.index = {shape: i for i, shape in enumerate(self.shapes)}
+        self.init = np.asarray(init, dtype=np.float32)
+        self.learn = np.asarray(learn, dtype=np.float32)
+        self.slip = np.asarray(slip, dtype=np.float32)
+        self.guess = np.asarray(guess, dtype=np.float32)
+
+@on_load(path=ONTOLOGY_PATH)
+@lru_cache(maxsize=KEEP_VERSIONS)
+def params_from_ontology(onto):
+    shapes = list(SHAPES)
+    values = {name: [DEFAULT_PARAMS[name]] * len(shapes) for name in DEFAULT_PARAMS}
+    for shape in onto.Shape.instances():
+        key = shape.is_a[0].name.lower()
+        if key not in shapes:
+            shapes.append(key)
+            for name in values:
+                values[name].append(DEFAULT_PARAMS[name])
+        i = shapes.index(key)
+        for name, prop in ONTOLOGY_PROPS.items():
+            found = getattr(shape, prop, None)
+            if found:
+                values[name][i] = found[0]
+    return BKTParams(shapes, **values)
+
+def load_params(path=ONTOLOGY_PATH, version=None):
+    return params_from_ontology(load_ontology(path, version))
+
+# ------------------- UPDATE RULE -------------------
+def step(p, outcome, learn, slip, guess):
+    # Works element-wise on arrays as well as on scalars
+    correct = np.asarray(outcome) == CORRECT
+    right = p * (1 - slip) / (p * (1 - slip) + (1 - p) * guess)
+    wrong = p * slip / (p * slip + (1 - p) * (1 - guess))
+    posterior = np.where(correct, right, wrong)
+    return posterior + (1 - posterior) * learn
+
+def update_mastery(p, shape, outcome, params=None):
+    params = params or load_params()
+    i = params.index[shape]
+    return float(step(p, outcome, params.learn[i], params.slip[i], params.guess[i]))
+
+def prior_mastery(params=None):
+    params = params or load_params()
+    return {shape: float(params.init[i]) for i, shape in enumerate(params.shapes)}
+
+# ------------------- COHORT STATE -------------------
+class Cohort:
+    # learners x shapes matrix of P(mastered), grown by doubling
+    def __init__(self, params=None, capacity=1024):
+        self.params = params or load_params()
+        self.p = np.tile(self.params.init, (capacity, 1))
+        self.rows = {}
+
+    def row(self, learner):
+        i = self.rows.get(learner)
+        if i is None:
+            i = self.rows[learner] = len(self.rows)
+            if i >= len(self.p):
+                grown = np.tile(self.params.init, (2 * len(self.p), 1))
+                grown[:len(self.p)] = self.p
+                self.p = grown
+        return i
+
+    def update(self, learners, shapes, outcomes):
+        # One vectorized step; each (learner, shape) pair may appear once
+        rows = np.fromiter((self.row(l) for l in learners), dtype=np.int64)
+        cols = np.fromiter((self.params.index[s] for s in shapes), dtype=np.int64)
+        p = self.p[rows, cols]
+        new = step(p, outcomes, self.params.learn[cols], self.params.slip[cols], self.params.guess[cols])
+        self.p[rows, cols] = new
+        return new - p
+
+    def replay(self, learners, shapes, outcomes):
+        # Apply a log of attempts in order. Attempts are grouped into rounds
+        # by their occurrence number per (learner, shape), and each round is
+        # one vectorized update. Returns the mastery delta of every attempt.
+        learners = np.asarray(learners)
+        shapes = np.asarray(shapes)
+        outcomes = np.asarray(outcomes)
+        seen = {}
+        rounds = np.empty(len(learners), dtype=np.int64)
+        for i, key in enumerate(zip(learners.tolist(), shapes.tolist())):
+            rounds[i] = seen[key] = seen.get(key, -1) + 1
+
+        deltas = np.zeros(len(learners), dtype=np.float32)
+        for r in range(int(rounds.max()) + 1 if len(rounds) else 0):
+            idx = np.flatnonzero(rounds == r)
+            deltas[idx] = self.update(learners[idx], shapes[idx], outcomes[idx])
+        return deltas
+
+    def mastery(self, learner):
+        i = self.row(learner)
+        return {shape: float(self.p[i, j]) for j, shape in enumerate(self.params.shapes)}
@@ -0,0 +1,143 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from write_behind import WriteBehind, shared
+
+# Persistent learner model. Mastery scores are kept per (learner, shape) in
+# SQLite by default or in a JSON file for development. Updates go through a
+# write-behind buffer (write_behind.py) that coalesces repeated writes to the same key and
+# flushes in one transaction, either every FLUSH_INTERVAL seconds or as soon
+# as MAX_PENDING keys are dirty.
+DEFAULT_PATH = os.environ.get("LEARNER_STORE", "learners.sqlite3")
+FLUSH_INTERVAL = 2.0
+MAX_PENDING = 500
+
+# ------------------- BACKENDS -------------------
+class SQLiteStore:
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock:
+            # WAL + NORMAL sync: one fsync per checkpoint, not per commit
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS mastery ("
+                "learner TEXT, shape TEXT, score REAL, updated REAL, "
+                "PRIMARY KEY (learner, shape))"
+            )
+            self.db.commit()
+
+    def load(self, learner):
+        with self.lock:
+            rows = self.db.execute("SELECT shape, score FROM mastery WHERE learner=?", (learner,))
+            return {shape: score for shape, score in rows}
+
+    def load_all(self):
+        # Every (learner, shape, score) row, for cohort-wide views
+        with self.lock:
+            return self.db.execute("SELECT learner, shape, score FROM mastery").fetchall()
+
+    def save_many(self, rows):
+        # rows: iterable of (learner, shape, score)
+        now = time.time()
+        with self.lock:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO mastery VALUES (?, ?, ?, ?)",
+                [(learner, shape, score, now) for learner, shape, score in rows],
+            )
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+class JSONStore:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.data = self.upgrade(json.load(f))
+
+    @staticmethod
+    def upgrade(data):
+        # Legacy mastery.json: {"SquareIndividual": 40, ...} for one learner
+        if data and all(isinstance(v, (int, float)) for v in data.values()):
+            return {"default": {k.replace("Individual", "").lower(): v for k, v in data.items()}}
+        return data
+
+    def load(self, learner):
+        with self.lock:
+            return dict(self.data.get(learner, {}))
+
+    def load_all(self):
+        with self.lock:
+            return [(learner, shape, score) for learner, scores in self.data.items()
+                    for shape, score in scores.items()]
+
+    def save_many(self, rows):
+        with self.lock:
+            for learner, shape, score in rows:
+                self.data.setdefault(learner, {})[shape] = score
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.data, f)
+            os.replace(tmp, self.path)
+
+    def close(self):
+        pass
+
+def open_backend(path):
+    return JSONStore(path) if path.endswith(".json") else SQLiteStore(path)
+
+# ------------------- WRITE-BEHIND BUFFER -------------------
+class LearnerStore(WriteBehind):
+    # Buffers (learner, shape) -> score, so repeated writes to a key
+    # coalesce; a failed batch (e.g. "database is locked" with several
+    # worker processes) is retried with any newer scores kept. Not capped:
+    # the buffer holds at most one score per learner and shape.
+    def __init__(self, backend, flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING):
+        self.backend = backend
+        super().__init__(flush_interval, max_pending)
+
+    def new_buffer(self):
+        return {}
+
+    def insert(self, buffer, item):
+        key, score = item
+        buffer[key] = score
+
+    def requeue(self, batch, pending):
+        return {**batch, **pending}
+
+    def write(self, batch):
+        self.backend.save_many((learner, shape, score) for (learner, shape), score in batch.items())
+
+    def get(self, learner):
+        # Writes still in flight stay visible until they land
+        mastery = self.backend.load(learner)
+        with self.lock:
+            for buffer in (self.inflight, self.pending):
+                for (who, shape), score in buffer.items():
+                    if who == learner:
+                        mastery[shape] = score
+        return mastery
+
+    def update(self, learner, shape, score):
+        self.add(((learner, shape), score))
+
+    def close(self):
+        if not self.stopped.is_set():
+            super().close()
+            self.backend.close()
+
+def open_store(path):
+    return LearnerStore(open_backend(path))
+
+def shared_store(path=DEFAULT_PATH):
+    return shared(open_store, path)
@@ -0,0 +1,153 @@
+import bisect
+import mmap
+import os
+import threading
+import time
+from contextlib import nullcontext
+from functools import wraps
+
+# Per-stage latency histograms. Every thread records into its own bucket
+# arrays, so the hot path never takes a lock; readers merge all threads'
+# arrays when rendering. Set TUTOR_METRICS=0 to disable: decorators then
+# return the undecorated function and stage() a shared no-op context.
+ENABLED = os.environ.get("TUTOR_METRICS", "1") != "0"
+
+BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+clock = time.perf_counter
+
+_local = threading.local()
+_threads = []
+_retired = {}
+_threads_lock = threading.Lock()
+_null = nullcontext()
+
+def _merge(into, hists):
+    for name, h in list(hists.items()):
+        total = into.setdefault(name, [0] * len(h))
+        for i, value in enumerate(list(h)):
+            total[i] += value
+
+def _histograms():
+    # stage -> [bucket counts..., +Inf count, sum] for the calling thread
+    hists = getattr(_local, "hists", None)
+    if hists is None:
+        hists = _local.hists = {}
+        with _threads_lock:
+            # Streamlit runs each rerun in a new thread: fold finished
+            # threads into one retired histogram so the list stays short
+            for entry in [e for e in _threads if not e[0].is_alive()]:
+                _merge(_retired, entry[1])
+                _threads.remove(entry)
+            _threads.append((threading.current_thread(), hists))
+    return hists
+
+def observe(stage, seconds):
+    if not ENABLED:
+        return
+    hists = _histograms()
+    h = hists.get(stage)
+    if h is None:
+        h = hists[stage] = [0] * (len(BUCKETS) + 2)
+    h[bisect.bisect_left(BUCKETS, seconds)] += 1
+    h[-1] += seconds
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = clock()
+
+    def __exit__(self, *exc):
+        observe(self.name, clock() - self.start)
+
+def stage(name):
+    return _Stage(name) if ENABLED else _null
+
+def timed(name):
+    def decorate(func):
+        if not ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, clock() - start)
+        return wrapper
+    return decorate
+
+# ------------------- CROSS-PROCESS COUNTERS -------------------
+# Counters shared by forked worker processes: an anonymous shared mapping
+# created in the parent before forking, with one row of int64 slots per
+# worker. Each worker only ever writes its own row, so no lock is needed;
+# readers sum the rows.
+class SharedCounters:
+    def __init__(self, names, workers):
+        self.names = tuple(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.workers = workers
+        self.buf = mmap.mmap(-1, 8 * len(self.names) * workers)
+        self.slots = memoryview(self.buf).cast("q")
+        self.row = 0
+
+    def bind(self, worker):
+        # Called in each child after fork: worker number in [0, workers)
+        self.row = worker * len(self.names)
+
+    def add(self, name, n=1):
+        self.slots[self.row + self.index[name]] += n
+
+    def totals(self):
+        width = len(self.names)
+        return {name: sum(self.slots[w * width + i] for w in range(self.workers))
+                for i, name in enumerate(self.names)}
+
+counters = None
+
+def share_counters(names, workers=1):
+    global counters
+    counters = SharedCounters(names, workers)
+    return counters
+
+def count(name, n=1):
+    if counters is not None:
+        counters.add(name, n)
+
+# ------------------- EXPORT -------------------
+def snapshot():
+    # stage -> merged [bucket counts..., +Inf count, sum] across threads
+    merged = {}
+    with _threads_lock:
+        _merge(merged, _retired)
+        for _, hists in _threads:
+            _merge(merged, hists)
+    return merged
+
+def render_prometheus():
+    lines = [
+        "# HELP tutor_stage_seconds Time spent in each tutor stage.",
+        "# TYPE tutor_stage_seconds histogram",
+    ]
+    for name, h in sorted(snapshot().items()):
+        cumulative = 0
+        for le, count in zip(BUCKETS + ("+Inf",), h[:-1]):
+            cumulative += count
+            lines.append(f'tutor_stage_seconds_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+        lines.append(f'tutor_stage_seconds_sum{{stage="{name}"}} {h[-1]:.9f}')
+        lines.append(f'tutor_stage_seconds_count{{stage="{name}"}} {cumulative}')
+    if counters is not None:
+        lines.append("# HELP tutor_events_total Events counted across all worker processes.")
+        lines.append("# TYPE tutor_events_total counter")
+        for name, value in counters.totals().items():
+            lines.append(f'tutor_events_total{{event="{name}"}} {value}')
+    return "\n".join(lines) + "\n"
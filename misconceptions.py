@@ -0,0 +1,34 @@
+from collections import namedtuple
+from functools import lru_cache
+from formulas import compile_formula
+
+# Misconception index, built once per loaded ontology. Each ErrorType linked
+# to a shape's formula through hasError becomes an ErrorPattern; if it has an
+# errorSignature (the area a student would get by making that mistake, e.g.
+# "b*h" for a triangle with the ½ forgotten) the signature is compiled so a
+# wrong answer is classified by evaluating a handful of tiny formulas instead
+# of scanning the ontology (see answer_tables.py).
+ErrorPattern = namedtuple("ErrorPattern", "name description signature")
+
+# A wrong method matches answers within this relative margin of its value
+SIGNATURE_RTOL = 1e-3
+
+def shape_key(shape):
+    return shape.is_a[0].name.lower()
+
+@lru_cache(maxsize=8)
+def get_index(onto):
+    # shape key ("triangle") -> tuple of ErrorPatterns
+    index = {}
+    for shape in onto.Shape.instances():
+        patterns = []
+        for formula in getattr(shape, "hasFormula", []):
+            for error in getattr(formula, "hasError", []):
+                signature = getattr(error, "errorSignature", None)
+                patterns.append(ErrorPattern(
+                    error.name,
+                    error.errorDescription[0] if error.errorDescription else error.name,
+                    compile_formula(signature[0]) if signature else None,
+                ))
+        index[shape_key(shape)] = tuple(patterns)
+    return index
@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from owlready2 import World
+import metrics
+from formulas import clear_compiled
+from reasoning import REASONING, apply_inferences
+from snapshot import load_snapshot, source_hash
+
+# Registry of the parsed ontologies of a server process, shared read-only by
+# every session. Several ontology files can be loaded at once; a watcher
+# thread polls their mtimes and, when a file's content changes, loads the
+# new version and builds its derived indexes (see on_load) in the
+# background before swapping it in with a single assignment. Requests never
+# wait on a reload, and a session pinned to an older version keeps reading
+# it for as long as the registry retains it.
+WATCH_INTERVAL = float(os.environ.get("ONTOLOGY_WATCH_INTERVAL", "2"))
+KEEP_VERSIONS = 4
+
+# version: first 12 hex digits of the file's SHA-256, so every worker
+# process gives the same content the same version
+OntologyVersion = namedtuple("OntologyVersion", "path version mtime onto")
+
+_builders = []  # (absolute path or None for every file, builder)
+
+def on_load(builder=None, *, path=None):
+    # Register a function run on each newly loaded version of path (of
+    # every file if path is None) before it is swapped in, e.g. an
+    # lru_cached index builder; returns it unchanged. Also usable as
+    # @on_load(path=...).
+    if builder is None:
+        return lambda builder: on_load(builder, path=path)
+    _builders.append((path and os.path.abspath(path), builder))
+    return builder
+
+def build_version(path):
+    mtime = os.path.getmtime(path)
+    digest = source_hash(path)
+    # Prefer a compiled snapshot; parse the RDF/XML only when it is missing
+    # or stale (see snapshot.py)
+    with metrics.stage("ontology_load"):
+        onto = load_snapshot(path)
+        if onto is None:
+            world = World()
+            onto = world.get_ontology(path).load()
+    if REASONING:
+        apply_inferences(onto, path, digest)
+    for builder_path, builder in _builders:
+        if builder_path not in (None, path):
+            continue
+        try:
+            builder(onto)
+        except Exception as e:
+            # Not every ontology dialect supports every index
+            print(f"Index {builder.__name__} not built for {os.path.basename(path)}:", repr(e))
+    return OntologyVersion(path, digest[:12], mtime, onto)
+
+class OntologyRegistry:
+    def __init__(self, interval=WATCH_INTERVAL):
+        self.interval = interval
+        self.current = {}    # path -> OntologyVersion
+        self.versions = {}   # path -> OrderedDict(version -> OntologyVersion)
+        self.failed = {}     # path -> mtime of a version that did not load
+        self.lock = threading.Lock()
+        self.watcher = None
+
+    def get(self, path, version=None):
+        path = os.path.abspath(path)
+        entry = self.current.get(path)
+        if entry is None:
+            entry = self.add(path)
+        if version is None or version == entry.version:
+            return entry
+        # Pinned to an older version; the current one once it is evicted
+        return self.versions[path].get(version, entry)
+
+    def add(self, path):
+        with self.lock:
+            entry = self.current.get(path)
+            if entry is None:
+                entry = self.swap(build_version(path))
+        self.watch()
+        return entry
+
+    def swap(self, entry):
+        retained = self.versions.setdefault(entry.path, OrderedDict())
+        retained[entry.version] = entry
+        retained.move_to_end(entry.version)
+        while len(retained) > KEEP_VERSIONS:
+            _, old = retained.popitem(last=False)
+            clear_compiled(old.onto.world)
+        self.current[entry.path] = entry
+        return entry
+
+    def refresh(self, path):
+        # Reload path if its content changed since the current version
+        entry = self.current[path]
+        mtime = os.path.getmtime(path)
+        if mtime == entry.mtime or mtime == self.failed.get(path):
+            return entry
+        if source_hash(path)[:12] == entry.version:
+            self.current[path] = entry._replace(mtime=mtime)
+            return entry
+        try:
+            new = build_version(path)
+        except Exception as e:
+            # Typically a file caught half-written; retried on the next edit
+            print(f"Reload of {os.path.basename(path)} failed:", repr(e))
+            self.failed[path] = mtime
+            return entry
+        with self.lock:
+            return self.swap(new)
+
+    def poll(self):
+        for path in list(self.current):
+            try:
+                self.refresh(path)
+            except OSError:
+                pass  # file moved away; keep serving the loaded version
+
+    def watch(self):
+        if self.interval <= 0 or self.watcher is not None:
+            return
+        with self.lock:
+            if self.watcher is None:
+                self.watcher = threading.Thread(target=self._watch, name="ontology-watcher", daemon=True)
+                self.watcher.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            self.poll()
+
+    def after_fork(self):
+        # Forked workers inherit the loaded versions (shared copy-on-write)
+        # but not the watcher thread, nor a lock it may have held
+        self.lock = threading.Lock()
+        self.watcher = None
+        if self.current:
+            self.watch()
+
+registry = OntologyRegistry()
+os.register_at_fork(after_in_child=registry.after_fork)
+
+# ------------------- SHARED ONTOLOGY -------------------
+def load_ontology(path, version=None):
+    return registry.get(path, version).onto
+
+def current_version(path):
+    return registry.get(path).version
+
+def clear_cache():
+    with registry.lock:
+        registry.current.clear()
+        registry.versions.clear()
+        registry.failed.clear()
+    clear_compiled()
@@ -0,0 +1,91 @@
+import itertools
+from functools import lru_cache
+import numpy as np
+
+# Precomputed problem bank. The dimension space of every shape is small, so
+# all valid problems are enumerated once into per-shape arrays (dims,
+# expected area, question text). Generating a problem is then an O(1) draw
+# from a per-session seeded RNG, and a session is replayed exactly by
+# reusing its seed.
+DIM_RANGES = {
+    "square": {"s": range(3, 13)},
+    "rectangle": {"l": range(5, 16), "w": range(3, 11)},
+    "triangle": {"b": range(5, 16), "h": range(3, 11)},
+    "parallelogram": {"b": range(5, 16), "h": range(3, 11)},
+    "trapezium": {"a": range(4, 11), "b": range(6, 21), "h": range(3, 11)},
+    "circle": {"r": range(3, 11)},
+}
+
+# Extra validity rules on top of the ranges (b is 2 to 10 longer than a)
+CONSTRAINTS = {
+    "trapezium": lambda d: d["a"] + 2 <= d["b"] <= d["a"] + 10,
+}
+
+AREAS = {
+    "square": lambda d: d["s"] * d["s"],
+    "rectangle": lambda d: d["l"] * d["w"],
+    "triangle": lambda d: 0.5 * d["b"] * d["h"],
+    "parallelogram": lambda d: d["b"] * d["h"],
+    "trapezium": lambda d: 0.5 * (d["a"] + d["b"]) * d["h"],
+    "circle": lambda d: np.pi * d["r"] * d["r"],
+}
+
+QUESTIONS = {
+    "square": "Find the area of a square with side **{s}** units.",
+    "rectangle": "Find the area of a rectangle with length **{l}** and width **{w}**.",
+    "triangle": "Find the area of a triangle with base **{b}** and height **{h}**.",
+    "parallelogram": "Find the area of a parallelogram with base **{b}** and height **{h}**.",
+    "trapezium": "Find the area of a trapezium with bases **{a}**, **{b}** and height **{h}**.",
+    "circle": "Find the area of a circle with radius **{r}**.",
+}
+
+# Dimension names as used by each app (app.py uses the short ones)
+LONG_NAMES = {
+    "square": ("side",),
+    "rectangle": ("length", "width"),
+    "triangle": ("base", "height"),
+    "parallelogram": ("base", "height"),
+    "trapezium": ("a", "b", "height"),
+    "circle": ("radius",),
+}
+
+class ShapeTable:
+    def __init__(self, shape):
+        self.shape = shape
+        self.names = tuple(DIM_RANGES[shape])
+        rule = CONSTRAINTS.get(shape, lambda d: True)
+        rows = [
+            combo for combo in itertools.product(*DIM_RANGES[shape].values())
+            if rule(dict(zip(self.names, combo)))
+        ]
+        self.dims = np.array(rows, dtype=np.int16)
+        columns = {n: self.dims[:, i].astype(float) for i, n in enumerate(self.names)}
+        self.expected = np.round(AREAS[shape](columns), 2)
+        self.questions = tuple(QUESTIONS[shape].format(**dict(zip(self.names, row))) for row in rows)
+
+    def __len__(self):
+        return len(self.dims)
+
+class ProblemBank:
+    def __init__(self, dim_names=None):
+        self.tables = {shape: ShapeTable(shape) for shape in DIM_RANGES}
+        self.dim_names = dim_names or {shape: t.names for shape, t in self.tables.items()}
+
+    def problem(self, shape, index):
+        table = self.tables[shape]
+        values = table.dims[index].tolist()
+        return {
+            "shape": shape,
+            "dims": dict(zip(self.dim_names[shape], values)),
+            "expected": float(table.expected[index]),
+            "question": table.questions[index],
+            "index": int(index),
+        }
+
+    def sample(self, shape, rng):
+        # rng is a random.Random owned by the session
+        return self.problem(shape, rng.randrange(len(self.tables[shape])))
+
+@lru_cache(maxsize=None)
+def get_bank(long_names=False):
+    return ProblemBank(LONG_NAMES if long_names else None)
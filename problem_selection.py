@@ -0,0 +1,94 @@
+import heapq
+import os
+from collections import Counter
+from functools import lru_cache
+from graphlib import TopologicalSorter
+from knowledge_tracing import SHAPES
+from ontology_store import KEEP_VERSIONS, load_ontology, on_load
+
+# Ontology-driven problem selection. A shape is a prerequisite of another
+# when its components (hasComponent on the shape and usesComponent on its
+# formulas, counted by component class) are a strict sub-multiset of the
+# other's: a triangle's base and height come before a trapezium's two bases
+# and height. Shapes are then served from a heap ordered by readiness (all
+# prerequisites mastered), mastery and topological rank.
+ONTOLOGY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tstONt.owl")
+MASTERY_THRESHOLD = 0.85
+
+class PrerequisiteGraph:
+    def __init__(self, prerequisites):
+        # prerequisites: shape -> set of shapes that must be mastered first
+        self.prerequisites = {s: frozenset(p) for s, p in prerequisites.items()}
+        self.dependents = {s: set() for s in self.prerequisites}
+        for shape, before in self.prerequisites.items():
+            for p in before:
+                self.dependents[p].add(shape)
+        self.order = tuple(TopologicalSorter(self.prerequisites).static_order())
+        self.rank = {shape: i for i, shape in enumerate(self.order)}
+
+def components(shape):
+    found = Counter(c.is_a[0].name for c in getattr(shape, "hasComponent", []))
+    for formula in getattr(shape, "hasFormula", []):
+        used = Counter(c.is_a[0].name for c in getattr(formula, "usesComponent", []))
+        found |= used
+    return found
+
+@lru_cache(maxsize=KEEP_VERSIONS)
+def graph_from_ontology(onto, shapes):
+    parts = {s: Counter() for s in shapes}
+    for shape in onto.Shape.instances():
+        key = shape.is_a[0].name.lower()
+        if key in parts:
+            parts[key] |= components(shape)
+
+    prerequisites = {s: set() for s in shapes}
+    for a, a_parts in parts.items():
+        for b, b_parts in parts.items():
+            if a != b and a_parts and a_parts < b_parts:
+                prerequisites[b].add(a)
+    return PrerequisiteGraph(prerequisites)
+
+@on_load(path=ONTOLOGY_PATH)
+def default_graph(onto):
+    return graph_from_ontology(onto, SHAPES)
+
+def load_graph(shapes, path=ONTOLOGY_PATH, version=None):
+    return graph_from_ontology(load_ontology(path, version), tuple(shapes))
+
+# ------------------- SELECTOR -------------------
+class ProblemSelector:
+    # Keeps one live heap entry per shape; superseded entries are skipped
+    # lazily, so each mastery update costs O(log n) per affected shape.
+    def __init__(self, graph, mastery, threshold=MASTERY_THRESHOLD):
+        self.graph = graph
+        self.threshold = threshold
+        self.mastery = dict(mastery)
+        self.version = {shape: 0 for shape in self.mastery}
+        self.heap = []
+        for shape in self.mastery:
+            self.push(shape)
+
+    def ready(self, shape):
+        return all(self.mastery.get(p, 0) >= self.threshold for p in self.graph.prerequisites.get(shape, ()))
+
+    def push(self, shape):
+        self.version[shape] += 1
+        p = self.mastery[shape]
+        key = (not self.ready(shape), p >= self.threshold, p, self.graph.rank.get(shape, 0))
+        heapq.heappush(self.heap, (key, self.version[shape], shape))
+        if len(self.heap) > 4 * len(self.version):
+            # Drop superseded entries so long sessions keep the heap small
+            self.heap = [e for e in self.heap if e[1] == self.version[e[2]]]
+            heapq.heapify(self.heap)
+
+    def update(self, shape, p):
+        self.mastery[shape] = p
+        self.push(shape)
+        for dependent in self.graph.dependents.get(shape, ()):
+            if dependent in self.mastery:
+                self.push(dependent)
+
+    def next(self):
+        while self.heap[0][1] != self.version[self.heap[0][2]]:
+            heapq.heappop(self.heap)
+        return self.heap[0][2]
@@ -0,0 +1,57 @@
+import glob
+import os
+import sys
+import metrics
+from snapshot import source_hash
+
+# Opt-in reasoning (TUTOR_REASONING=1). The reasoner (HermiT, via Java) is
+# run once per ontology content hash and the triples it infers are saved
+# next to the .owl as N-Triples:
+#     AreaTutorII.owl.<sha256[:12]>.inferred.nt
+# Later loads of the same content read that file instead of starting Java.
+# An edited ontology has a new hash, so it is re-reasoned once (in the
+# registry's background reload) and the stale cache file is removed.
+REASONING = os.environ.get("TUTOR_REASONING", "0") == "1"
+INFERRED_IRI = "http://inferrence/"  # where owlready2 puts inferred facts
+
+def cache_path(owl_path, digest):
+    return f"{os.path.abspath(owl_path)}.{digest[:12]}.inferred.nt"
+
+def load_inferences(onto, path):
+    with open(path, "rb") as f:
+        onto.world.get_ontology(INFERRED_IRI).load(fileobj=f, format="ntriples")
+
+def reason(onto, path):
+    from owlready2 import sync_reasoner
+    world = onto.world
+    sync_reasoner(world, debug=0)
+    tmp_path = path + ".tmp"
+    world.get_ontology(INFERRED_IRI).save(file=tmp_path, format="ntriples")
+    os.replace(tmp_path, path)
+
+def apply_inferences(onto, owl_path, digest=None):
+    # Adds the inferred triples to onto's world; False if reasoning failed
+    path = cache_path(owl_path, digest or source_hash(owl_path))
+    if os.path.exists(path):
+        with metrics.stage("inferences_load"):
+            load_inferences(onto, path)
+        return True
+    try:
+        with metrics.stage("reasoner"):
+            reason(onto, path)
+    except Exception as e:
+        # No Java, or an inconsistent ontology: serve it without inferences
+        print(f"Reasoning over {os.path.basename(owl_path)} failed:", repr(e))
+        return False
+    for stale in glob.glob(glob.escape(os.path.abspath(owl_path)) + ".*.inferred.nt"):
+        if stale != path:
+            os.remove(stale)
+    return True
+
+if __name__ == "__main__":
+    # Precompute the caches, e.g. on a build machine that has Java
+    from owlready2 import World
+    for owl in sys.argv[1:] or ["AreaTutorII.owl", "tstONt.owl"]:
+        onto = World().get_ontology(os.path.abspath(owl)).load()
+        if apply_inferences(onto, owl):
+            print("reasoned", cache_path(owl, source_hash(owl)))
@@ -0,0 +1,276 @@
+import argparse
+import asyncio
+import gc
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import uuid
+from urllib.parse import parse_qs, urlsplit
+import metrics
+from event_log import shared_log
+from answer_tables import get_answer_tables
+from hints import get_engine
+from knowledge_tracing import load_params
+from learner_store import shared_store
+from problem_bank import get_bank
+from problem_selection import load_graph
+from tutor import TutorSession
+
+# Minimal asyncio HTTP/JSON front end for the tutoring core.
+#
+#   POST /session        {"learner": ..., "seed": ..., "long_names": false}
+#   POST /next_problem   {"session": ...}
+#   POST /submit_answer  {"session": ..., "answer": ...}
+#   POST /hint           {"session": ...}
+#   GET  /mastery?session=...
+#   GET  /metrics        (Prometheus text format)
+#
+# Several worker processes can accept on the same port (SO_REUSEPORT).
+# Session state lives in a shared SQLite table, so any worker can serve
+# any request of any session. The parent loads the ontologies and builds
+# every derived table before forking, so the workers share that memory
+# copy-on-write instead of each parsing its own World, and they count
+# events into one shared-memory segment (see metrics.SharedCounters).
+SESSION_DB = os.environ.get("TUTOR_SESSIONS", "sessions.sqlite3")
+MAX_BODY = 64 * 1024
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+COUNTERS = ("requests", "errors", "sessions", "answers", "hints")
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+# ------------------- SESSION STORAGE -------------------
+class SessionStore:
+    def __init__(self, path=SESSION_DB):
+        self.db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute("CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, state TEXT)")
+            self.db.commit()
+
+    def get(self, session_id):
+        with self.lock:
+            row = self.db.execute("SELECT state FROM sessions WHERE id=?", (session_id,)).fetchone()
+        if row is None:
+            raise HTTPError(404, f"Unknown session {session_id!r}")
+        return json.loads(row[0])
+
+    def put(self, session_id, state):
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?)", (session_id, json.dumps(state)))
+            self.db.commit()
+
+# ------------------- HANDLERS -------------------
+class TutorAPI:
+    def __init__(self, sessions, learners, events=None):
+        self.sessions = sessions
+        self.learners = learners
+        self.events = events
+
+    def load(self, params):
+        session_id = params.get("session")
+        if not session_id:
+            raise HTTPError(400, "Missing 'session'")
+        return session_id, TutorSession.from_state(self.sessions.get(session_id), self.learners, self.events)
+
+    def reply(self, session_id, session):
+        self.sessions.put(session_id, session.to_state())
+        return {"session": session_id, **session.view()}
+
+    def create(self, params):
+        learner = params.get("learner") or uuid.uuid4().hex
+        seed = params.get("seed")
+        session = TutorSession(
+            learner, self.learners.get(learner),
+            seed=int(seed) if seed is not None else None,
+            long_names=bool(params.get("long_names")),
+            learners=self.learners,
+            events=self.events,
+        )
+        session.load_new_problem()
+        metrics.count("sessions")
+        return self.reply(uuid.uuid4().hex, session)
+
+    def next_problem(self, params):
+        session_id, session = self.load(params)
+        session.next_problem()
+        return self.reply(session_id, session)
+
+    def submit_answer(self, params):
+        session_id, session = self.load(params)
+        session.submit_answer(params.get("answer"))
+        metrics.count("answers")
+        return self.reply(session_id, session)
+
+    def hint(self, params):
+        session_id, session = self.load(params)
+        session.hint()
+        metrics.count("hints")
+        return self.reply(session_id, session)
+
+    def mastery(self, params):
+        session_id, session = self.load(params)
+        return {"session": session_id, "mastery": session.mastery}
+
+    def metrics(self, params):
+        return metrics.render_prometheus()
+
+    def route(self, method, path):
+        routes = {
+            ("POST", "/session"): self.create,
+            ("POST", "/next_problem"): self.next_problem,
+            ("POST", "/submit_answer"): self.submit_answer,
+            ("POST", "/hint"): self.hint,
+            ("GET", "/mastery"): self.mastery,
+            ("GET", "/metrics"): self.metrics,
+        }
+        handler = routes.get((method, path))
+        if handler is None:
+            if any(p == path for _, p in routes):
+                raise HTTPError(405, f"{method} not allowed on {path}")
+            raise HTTPError(404, f"No route for {path}")
+        return handler
+
+# ------------------- HTTP -------------------
+async def read_request(reader):
+    line = await reader.readline()
+    if not line:
+        return None
+    method, target, _ = line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_BODY:
+        raise HTTPError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, target, headers, body
+
+def encode_response(status, payload, keep_alive):
+    # Handlers return dicts (sent as JSON) or plain text
+    if isinstance(payload, str):
+        body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+    else:
+        body, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: {content_type}; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+def make_handler(api):
+    async def handle(reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await read_request(reader)
+                    if request is None:
+                        break
+                    method, target, headers, body = request
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                    url = urlsplit(target)
+                    params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                    if body:
+                        try:
+                            params.update(json.loads(body))
+                        except (ValueError, TypeError):
+                            raise HTTPError(400, "Body must be a JSON object") from None
+                    status, payload = 200, api.route(method, url.path)(params)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except (ValueError, asyncio.IncompleteReadError):
+                    status, payload = 400, {"error": "Malformed request"}
+                except Exception as e:
+                    print("Error handling request:", repr(e))
+                    status, payload = 500, {"error": "Internal error"}
+                metrics.count("requests")
+                if status >= 500:
+                    metrics.count("errors")
+                writer.write(encode_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+    return handle
+
+# ------------------- WORKERS -------------------
+def make_socket(host, port, reuse_port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    return sock
+
+async def serve(sock):
+    api = TutorAPI(SessionStore(), shared_store(), shared_log())
+    server = await asyncio.start_server(make_handler(api), sock=sock)
+    async with server:
+        await server.serve_forever()
+
+def preload():
+    # Everything a request reads, built once (in the parent when forking)
+    for long_names in (False, True):
+        get_bank(long_names=long_names)
+    params = load_params()
+    load_graph(params.shapes)
+    get_engine()
+    get_answer_tables()
+
+def run_worker(host, port, reuse_port, worker=0):
+    if metrics.counters is not None:
+        metrics.counters.bind(worker)
+    asyncio.run(serve(make_socket(host, port, reuse_port)))
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP/JSON API for the area tutor")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    metrics.share_counters(COUNTERS, max(args.workers, 1))
+    preload()
+    if args.workers <= 1:
+        run_worker(args.host, args.port, False)
+        return
+    if not hasattr(socket, "SO_REUSEPORT"):
+        raise SystemExit("--workers > 1 needs SO_REUSEPORT support")
+
+    # Create the shared session table before the workers race for it
+    SessionStore()
+    # Move everything loaded so far out of the collector's reach, so the
+    # workers' garbage collections do not write to (and un-share) it
+    gc.freeze()
+    fork = multiprocessing.get_context("fork")
+    procs = [
+        fork.Process(target=run_worker, args=(args.host, args.port, True, i))
+        for i in range(args.workers)
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import hashlib
+import os
+import sqlite3
+import sys
+from owlready2 import World
+
+# Compiled ontology snapshots: a pre-populated owlready2 SQLite quadstore
+# stored next to the .owl file. Loading one skips RDF/XML parsing entirely.
+# Each snapshot records the SHA-256 of the .owl it was built from and is
+# ignored as soon as the source content changes.
+SNAPSHOT_SUFFIX = ".sqlite3"
+
+def snapshot_path(owl_path):
+    return os.path.abspath(owl_path) + SNAPSHOT_SUFFIX
+
+def source_hash(owl_path):
+    with open(owl_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+# ------------------- COMPILE -------------------
+def compile_snapshot(owl_path, out_path=None):
+    owl_path = os.path.abspath(owl_path)
+    out_path = out_path or snapshot_path(owl_path)
+    tmp_path = out_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    world = World(filename=tmp_path)
+    onto = world.get_ontology(owl_path).load()
+    world.graph.execute("CREATE TABLE snapshot_meta (source_sha256 TEXT, base_iri TEXT)")
+    world.graph.execute(
+        "INSERT INTO snapshot_meta VALUES (?, ?)", (source_hash(owl_path), onto.base_iri)
+    )
+    world.save()
+    world.close()
+
+    # Readers never see a half-written snapshot
+    os.replace(tmp_path, out_path)
+    return out_path
+
+# ------------------- LOAD -------------------
+def read_meta(snap_path):
+    try:
+        db = sqlite3.connect(f"file:{snap_path}?mode=ro", uri=True)
+        try:
+            return db.execute("SELECT source_sha256, base_iri FROM snapshot_meta").fetchone()
+        finally:
+            db.close()
+    except sqlite3.Error:
+        return None
+
+def load_snapshot(owl_path):
+    # Returns the ontology from a fresh snapshot, or None if there is no
+    # snapshot or it was built from different .owl content.
+    snap_path = snapshot_path(owl_path)
+    if not os.path.exists(snap_path):
+        return None
+    meta = read_meta(snap_path)
+    if meta is None or meta[0] != source_hash(owl_path):
+        return None
+
+    # Copied into a private in-memory database: reasoning (reasoning.py)
+    # adds inferred triples to the world, and the snapshot file must stay
+    # as compiled.
+    src = sqlite3.connect(f"file:{snap_path}?mode=ro", uri=True)
+    db = sqlite3.connect(":memory:", isolation_level="EXCLUSIVE", check_same_thread=False)
+    src.backup(db)
+    src.close()
+
+    world = World(filename=snap_path, connection=db, exclusive=False)
+    return world.get_ontology(meta[1])
+
+if __name__ == "__main__":
+    for path in sys.argv[1:] or ["AreaTutorII.owl", "tstONt.owl"]:
+        print("compiled", compile_snapshot(path))
@@ -0,0 +1,188 @@
+import math
+import random
+import metrics
+from answer_tables import ERROR_ONTOLOGY, get_answer_tables
+from hints import HINT_ONTOLOGY, get_engine
+from knowledge_tracing import ONTOLOGY_PATH as PARAMS_ONTOLOGY
+from knowledge_tracing import CORRECT, HINTED, INCORRECT, load_params, prior_mastery, update_mastery
+from problem_bank import get_bank
+from ontology_store import current_version
+from problem_selection import ONTOLOGY_PATH, ProblemSelector, load_graph
+
+# Headless tutoring core shared by the Streamlit apps and the HTTP server.
+# A TutorSession holds one learner's problem, feedback, hint level and
+# mastery (P(mastered) as a percentage) and the misconception its last
+# wrong answer matched, if any. It has no Streamlit dependency and
+# round-trips through a small JSON-able dict (to_state/from_state).
+class TutorSession:
+    def __init__(self, learner_id, mastery=None, seed=None, long_names=False,
+                 ontology_path=ONTOLOGY_PATH, learners=None, ontology_versions=None, events=None):
+        self.learner_id = learner_id
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2 ** 32)
+        self.long_names = long_names
+        self.ontology_path = ontology_path
+        # A session reads every ontology file it uses (prerequisites, answer
+        # tables, BKT parameters, hints) at the version it started on, across
+        # reloads: path -> version
+        self.ontology_versions = dict(ontology_versions or {})
+        for path in (ontology_path, ERROR_ONTOLOGY, PARAMS_ONTOLOGY, HINT_ONTOLOGY):
+            if not self.ontology_versions.get(path):
+                self.ontology_versions[path] = current_version(path)
+        self.learners = learners
+        self.events = events
+
+        # Only shapes the problem bank can serve are tracked and selected; a
+        # shape newly added to the ontology is skipped until the bank has it
+        servable = self.bank.tables
+        self.mastery = {s: round(100 * p, 1) for s, p in prior_mastery(self.params).items() if s in servable}
+        self.mastery.update((s, v) for s, v in (mastery or {}).items() if s in self.mastery)
+        self.selector = ProblemSelector(
+            load_graph(tuple(self.mastery), ontology_path, self.ontology_versions[ontology_path]),
+            {s: v / 100 for s, v in self.mastery.items()}
+        )
+
+        self.count = 0
+        self.problem = None
+        self.feedback = ""
+        self.hint_level = 0
+        self.misconception = None
+        self.answered = False
+        self.attempted = False
+
+    @property
+    def bank(self):
+        return get_bank(long_names=self.long_names)
+
+    @property
+    def params(self):
+        return load_params(PARAMS_ONTOLOGY, self.ontology_versions[PARAMS_ONTOLOGY])
+
+    # ------------------- PROBLEMS -------------------
+    @metrics.timed("generate_problem")
+    def load_new_problem(self):
+        shape = self.selector.next()
+        # Each problem has its own RNG derived from (seed, problem number),
+        # so any problem of a session can be regenerated on its own
+        rng = random.Random(self.seed * 1_000_003 + self.count)
+        self.count += 1
+        self.problem = self.bank.sample(shape, rng)
+        self.feedback = ""
+        self.hint_level = 0
+        self.misconception = None
+        self.answered = False
+        self.attempted = False
+        self.log("next_question", shape=shape, idx=self.problem["index"])
+        return self.problem
+
+    def next_problem(self):
+        if self.problem is not None and not self.answered:
+            return self.problem
+        return self.load_new_problem()
+
+    # ------------------- ANSWERS -------------------
+    @metrics.timed("check_answer")
+    def submit_answer(self, user_input):
+        if self.answered:
+            return self.feedback
+        try:
+            user_input = float(user_input)
+        except (TypeError, ValueError):
+            user_input = None
+        if user_input is None or not math.isfinite(user_input):
+            self.feedback = "⚠️ Please enter a valid number."
+            return self.feedback
+
+        # One binary search gives both the verdict and the wrong method used
+        shape = self.problem["shape"]
+        tables = get_answer_tables(ERROR_ONTOLOGY, self.ontology_versions[ERROR_ONTOLOGY])
+        correct, misconception = tables[shape].check(self.problem["index"], user_input)
+
+        # Only the first attempt at a problem is evidence for knowledge tracing
+        first = not self.attempted
+        if first:
+            self.attempted = True
+            if not correct:
+                outcome = INCORRECT
+            elif self.hint_level:
+                outcome = HINTED
+            else:
+                outcome = CORRECT
+            p = update_mastery(self.mastery[shape] / 100, shape, outcome, self.params)
+            self.mastery[shape] = round(100 * p, 1)
+            self.selector.update(shape, p)
+            if self.learners is not None:
+                self.learners.update(self.learner_id, shape, self.mastery[shape])
+
+        if correct:
+            self.feedback = "✅ Correct! Click **Next Question** to continue."
+            self.answered = True
+        else:
+            self.misconception = misconception
+            self.feedback = "❌ Incorrect. Try again or use a hint."
+        self.log("check_answer", shape=shape, ok=correct, ans=user_input,
+                 mis=None if correct else self.misconception,
+                 first=first, lvl=self.hint_level, p=self.mastery[shape])
+        return self.feedback
+
+    # ------------------- HINTS -------------------
+    @metrics.timed("give_hint")
+    def hint(self):
+        if self.answered:
+            return self.feedback
+        shape = self.problem["shape"]
+        engine = get_engine(HINT_ONTOLOGY, self.ontology_versions[HINT_ONTOLOGY])
+        self.feedback, self.hint_level = engine.next_hint(shape, self.hint_level, self.misconception)
+        self.log("give_hint", shape=shape, lvl=self.hint_level, mis=self.misconception)
+        self.misconception = None
+        return self.feedback
+
+    def log(self, event, **fields):
+        if self.events is not None:
+            self.events.record(event, learner=self.learner_id, **fields)
+
+    # ------------------- STATE -------------------
+    def view(self):
+        # What a client may see: no expected answer
+        problem = self.problem or {}
+        return {
+            "shape": problem.get("shape"),
+            "dims": problem.get("dims"),
+            "question": problem.get("question"),
+            "feedback": self.feedback,
+            "hint_level": self.hint_level,
+            "answered": self.answered,
+            "mastery": dict(self.mastery),
+        }
+
+    def to_state(self):
+        problem = self.problem
+        return {
+            "learner_id": self.learner_id,
+            "seed": self.seed,
+            "long_names": self.long_names,
+            "ontology_path": self.ontology_path,
+            "ontology_versions": self.ontology_versions,
+            "mastery": self.mastery,
+            "count": self.count,
+            "problem": [problem["shape"], problem["index"]] if problem else None,
+            "feedback": self.feedback,
+            "hint_level": self.hint_level,
+            "misconception": self.misconception,
+            "answered": self.answered,
+            "attempted": self.attempted,
+        }
+
+    @classmethod
+    def from_state(cls, state, learners=None, events=None):
+        session = cls(state["learner_id"], state["mastery"], state["seed"],
+                      state["long_names"], state["ontology_path"], learners,
+                      state["ontology_versions"], events)
+        session.count = state["count"]
+        if state["problem"]:
+            session.problem = session.bank.problem(*state["problem"])
+        session.feedback = state["feedback"]
+        session.hint_level = state["hint_level"]
+        session.misconception = state.get("misconception")
+        session.answered = state["answered"]
+        session.attempted = state["attempted"]
+        return session
@@ -1,34 +1,61 @@
-from owlready2 import get_ontology, sync_reasoner
-import numpy as np
+import os
+import metrics
 
-onto_path = "./"
-onto = get_ontology("AreaTutorII.owl").load()
-#sync_reasoner()  # optional reasoning
+# utils is a lazily initialised service: owlready2, numpy and the ontology
+# are only imported/loaded on the first query, so importing utils is cheap
+# for tools and workers that never ask for a shape. Servers can call
+# warm_up() at start-up to pay the cost before the first request.
+ONTOLOGY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "AreaTutorII.owl")
+
+def configure(path):
+    # Point utils at another ontology file; takes effect on the next query
+    global ONTOLOGY_PATH
+    ONTOLOGY_PATH = os.path.abspath(path)
+
+def get_ontology():
+    # The registry swaps in edited versions, so look it up on every query
+    from ontology_store import load_ontology
+    # Inferred facts are added at load time with TUTOR_REASONING=1 (reasoning.py)
+    return load_ontology(ONTOLOGY_PATH)
+
+def get_model():
+    # Plain-object projection of the ontology (see domain_model.py)
+    from domain_model import project
+    return project(get_ontology())
+
+def warm_up():
+    # Load the ontology and project it; projecting compiles every formula
+    # and builds the error index
+    return get_model()
+
+def __getattr__(name):
+    # Backwards compatible `utils.onto`, loaded on first access
+    if name == "onto":
+        return get_ontology()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ------------------- SHAPE FUNCTIONS -------------------
+# Shapes may be given as domain_model.Shape records, names/keys
+# ("triangle") or owlready2 individuals
 def get_shapes():
-    return list(onto.Shape.instances())
+    return list(get_model().shapes)
 
 def get_lesson(shape):
-    for lesson in onto.Lesson.instances():
-        if shape in lesson.illustratesShape:
-            return lesson
-    return None
+    model = get_model()
+    return model.lesson_for.get(model.shape(shape).name)
 
 def get_examples(shape):
     lesson = get_lesson(shape)
-    return list(lesson.hasExample) if lesson else []
+    return list(lesson.examples) if lesson else []
 
 def get_formula(shape):
-    return shape.hasFormula[0].formulaText
+    return get_model().shape(shape).formula.expression
 
 # ------------------- AREA CALCULATION -------------------
+@metrics.timed("compute_area")
 def compute_area(shape, dims):
-    formula = get_formula(shape)
-    local_vars = {d: val for d, val in dims.items()}
-    local_vars['pi'] = np.pi
     try:
-        area = eval(formula.replace('^', '**'), {}, local_vars)
+        area = get_model().shape(shape).formula.compiled(dims)
         return float(area)
     except Exception as e:
         print("Error computing area:", e)
@@ -42,18 +69,20 @@ def check_unit(dims, expected_units):
     return True
 
 # ------------------- MISCONCEPTION DETECTION -------------------
+@metrics.timed("detect_misconceptions")
 def detect_misconceptions(shape, student_value, correct_value, dims, unit_used):
-    tol = 1e-3 * correct_value
+    # Judged like the tutor's answers (answer_tables.py): the formula's
+    # ontology tolerance, π≈3.14 accepted, then the modelled wrong methods
+    import numpy as np
+    from answer_tables import rules_for
+    rules = rules_for(get_ontology())[get_model().shape(shape).key]
     mistakes = []
 
     # 1. Numeric correctness
-    if abs(student_value - correct_value) > tol:
-        for mis in onto.Misconception.instances():
-            if mis.relatesToShape[0] == shape:
-                # Use keyword matching in description as simple detection logic
-                text = mis.misconceptionText.lower()
-                if shape.name.lower() in text:
-                    mistakes.append(mis.misconceptionText)
+    values = {k: np.array([v['value'] if isinstance(v, dict) else v], dtype=float) for k, v in dims.items()}
+    correct, found = rules.judge(values, np.array([correct_value], dtype=float), [student_value])
+    if not correct[0]:
+        mistakes.extend(found[0])
 
     # 2. Unit check
     if not check_unit({k: {"unit": v['unit']} for k,v in dims.items()}, [unit_used]):
@@ -62,37 +91,13 @@ def detect_misconceptions(shape, student_value, correct_value, dims, unit_used):
     return mistakes
 
 # ------------------- MULTILEVEL HINTS -------------------
-def get_hint(shape, level=1):
-    hints = {
-        "Triangle": [
-            "Hint 1: Area = 1/2 × base × height",
-            "Hint 2: Ensure you are using perpendicular height, not slanted side",
-            "Hint 3: Double-check units and multiply base × height ÷ 2"
-        ],
-        "Rectangle": [
-            "Hint 1: Area = length × width",
-            "Hint 2: Do not add sides, multiply them",
-            "Hint 3: Check units"
-        ],
-        "Square": [
-            "Hint 1: Area = side × side",
-            "Hint 2: Ensure you are not using circle formula π × side²",
-            "Hint 3: Units check"
-        ],
-        "Parallelogram": [
-            "Hint 1: Area = base × height",
-            "Hint 2: Use perpendicular height, not slanted side",
-            "Hint 3: Units check"
-        ],
-        "Trapezium": [
-            "Hint 1: Area = 1/2 × (base1 + base2) × height",
-            "Hint 2: Average the two bases, do not just multiply one",
-            "Hint 3: Units check"
-        ],
-        "Circle": [
-            "Hint 1: Area = π × radius²",
-            "Hint 2: Use radius, not diameter",
-            "Hint 3: Include π and correct units"
-        ]
-    }
-    return hints.get(shape.name, ["No hint available"])[level-1]
\ No newline at end of file
+def get_hint(shape, level=1, misconception=None):
+    # Hint ladders come from the ontology's hasHint individuals (hints.py)
+    from hints import engine_for
+    record = get_model().shape(shape)
+    if record is None:
+        return "No hint available"
+    engine = engine_for(get_model())
+    if misconception:
+        return engine.next_hint(record.key, level - 1, misconception)[0]
+    return engine.hint(record.key, level)
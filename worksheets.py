@@ -0,0 +1,138 @@
+import argparse
+import html
+import os
+import random
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from diagram_engine import render_svg
+from problem_bank import DIM_RANGES, get_bank
+
+# Printable worksheets: one section per student with numbered questions and
+# labelled diagrams from the same templates and problem bank as the apps.
+#     python worksheets.py --students 30 --problems 20 --out class.html
+# Problems are drawn first, the distinct (shape, dims) diagrams of the whole
+# class are rendered once in a process pool, and the HTML is then streamed
+# to disk one student at a time. Print it (or pass --pdf, which needs
+# weasyprint) to get the paper copy.
+PAGE_CSS = """
+@page { size: A4; margin: 12mm; }
+body { font-family: sans-serif; font-size: 11pt; }
+.student { break-after: page; }
+.grid { display: grid; grid-template-columns: 1fr 1fr; gap: 6mm; }
+.problem { break-inside: avoid; border: 1px solid #bbb; padding: 3mm; }
+.problem svg { width: 100%; height: 48mm; }
+.answer { margin-top: 2mm; border-bottom: 1px solid #000; height: 7mm; }
+.key td, .key th { padding: 1mm 4mm; text-align: left; }
+"""
+BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+
+# ------------------- PROBLEMS -------------------
+def assign_problems(students, per_student, seed, shapes=tuple(DIM_RANGES)):
+    # Yields one list of bank problems per student. Each student gets a
+    # seeded, shape-balanced set with no repeated problem.
+    bank = get_bank()
+    if per_student > sum(len(bank.tables[s]) for s in shapes):
+        raise ValueError(f"The bank has fewer than {per_student} problems for {', '.join(shapes)}")
+    for student in range(students):
+        rng = random.Random(seed * 1_000_003 + student)
+        order = list(shapes)
+        rng.shuffle(order)
+        # Round-robin quotas, skipping shapes whose problems are used up
+        quota = dict.fromkeys(order, 0)
+        while sum(quota.values()) < per_student:
+            for shape in order:
+                if sum(quota.values()) < per_student and quota[shape] < len(bank.tables[shape]):
+                    quota[shape] += 1
+        picked = [
+            bank.problem(shape, index)
+            for shape in order
+            for index in rng.sample(range(len(bank.tables[shape])), quota[shape])
+        ]
+        rng.shuffle(picked)
+        yield picked
+
+# ------------------- DIAGRAMS -------------------
+def diagram_key(problem):
+    return problem["shape"], tuple(problem["dims"].items())
+
+def render_one(key):
+    shape, dims = key
+    return key, render_svg(shape, dict(dims))
+
+def render_all(keys, workers):
+    # key -> labelled SVG markup; identical diagrams are rendered once
+    keys = list(dict.fromkeys(keys))
+    if workers <= 1:
+        return dict(map(render_one, keys))
+    with ProcessPoolExecutor(workers) as pool:
+        return dict(pool.map(render_one, keys, chunksize=max(1, len(keys) // (4 * workers))))
+
+# ------------------- OUTPUT -------------------
+def question_html(text):
+    return BOLD_RE.sub(r"<b>\1</b>", html.escape(text))
+
+def student_html(number, problems, diagrams):
+    cells = []
+    for i, problem in enumerate(problems, 1):
+        svg = diagrams.get(diagram_key(problem)) or ""
+        cells.append(
+            f'<div class="problem"><p><b>{i}.</b> {question_html(problem["question"])}</p>'
+            f'{svg}<div class="answer">Area =</div></div>'
+        )
+    return (f'<section class="student"><h2>Worksheet {number}</h2>'
+            f'<p>Name: ____________________</p><div class="grid">{"".join(cells)}</div></section>\n')
+
+def key_html(number, problems):
+    rows = "".join(
+        f'<tr><td>{i}</td><td>{p["shape"]}</td><td>{p["expected"]:g}</td></tr>'
+        for i, p in enumerate(problems, 1)
+    )
+    return (f'<section class="student key"><h2>Answer key - worksheet {number}</h2>'
+            f'<table><tr><th>#</th><th>Shape</th><th>Area</th></tr>{rows}</table></section>\n')
+
+def write_worksheets(path, students, per_student, seed=0, workers=None, answer_key=True):
+    workers = workers or os.cpu_count() or 1
+    sheets = list(assign_problems(students, per_student, seed))
+    diagrams = render_all((diagram_key(p) for sheet in sheets for p in sheet), workers)
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>Area worksheets</title>"
+                f"<style>{PAGE_CSS}</style></head><body>\n")
+        for number, sheet in enumerate(sheets, 1):
+            f.write(student_html(number, sheet, diagrams))
+        if answer_key:
+            for number, sheet in enumerate(sheets, 1):
+                f.write(key_html(number, sheet))
+        f.write("</body></html>\n")
+    return len(sheets), len(diagrams)
+
+def to_pdf(html_path, pdf_path):
+    try:
+        import weasyprint
+    except ImportError:
+        raise ImportError("PDF output requires weasyprint") from None
+    weasyprint.HTML(filename=html_path).write_pdf(pdf_path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate printable area worksheets")
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--problems", type=int, default=20, help="problems per worksheet")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: one per core)")
+    parser.add_argument("--no-key", action="store_true", help="leave out the answer keys")
+    parser.add_argument("--out", default="worksheets.html")
+    parser.add_argument("--pdf", help="also convert the HTML to this PDF file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    sheets, diagrams = write_worksheets(
+        args.out, args.students, args.problems, args.seed, args.workers, not args.no_key
+    )
+    if args.pdf:
+        to_pdf(args.out, args.pdf)
+    print(f"wrote {sheets} worksheets ({diagrams} distinct diagrams) to {args.pdf or args.out} "
+          f"in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import atexit
+import os
+import threading
+
+# Write-behind buffering shared by the learner store and the event log.
+# Writes are buffered in memory and handed to write() in one batch by a
+# daemon thread every flush_interval seconds, or inline as soon as
+# max_pending items are buffered. A batch that fails to write (a locked
+# database, a full disk) is put back ahead of newer items and retried on
+# the next flush, so the thread never dies. While writes keep failing,
+# nothing is flushed inline, and if max_buffered is set the oldest items
+# beyond it are dropped and counted in `dropped`.
+class WriteBehind:
+    def __init__(self, flush_interval, max_pending, max_buffered=None):
+        self.max_pending = max_pending
+        self.max_buffered = max_buffered
+        self.pending = self.new_buffer()
+        self.inflight = self.new_buffer()
+        self.failing = False
+        self.dropped = 0
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, args=(flush_interval,), daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    # Buffer hooks: a list of lines by default; LearnerStore coalesces by key
+    def new_buffer(self):
+        return []
+
+    def insert(self, buffer, item):
+        buffer.append(item)
+
+    def requeue(self, batch, pending):
+        # A failed batch followed by what was buffered since
+        return batch + pending
+
+    def drop_oldest(self, buffer, count):
+        del buffer[:count]
+
+    def write(self, batch):
+        raise NotImplementedError
+
+    def add(self, item):
+        with self.lock:
+            self.insert(self.pending, item)
+            full = len(self.pending) >= self.max_pending and not self.failing
+        if full:
+            self.flush()
+
+    def flush(self):
+        # Writes still in flight stay in self.inflight until they land
+        with self.flush_lock:
+            with self.lock:
+                batch, self.pending = self.pending, self.new_buffer()
+                self.inflight = batch
+            if not batch:
+                return True
+            try:
+                self.write(batch)
+            except Exception as e:
+                print(f"{type(self).__name__} flush failed:", repr(e))
+                with self.lock:
+                    self.pending = self.requeue(batch, self.pending)
+                    self.inflight = self.new_buffer()
+                    self.failing = True
+                    excess = len(self.pending) - (self.max_buffered or len(self.pending))
+                    if excess > 0:
+                        self.drop_oldest(self.pending, excess)
+                        self.dropped += excess
+                return False
+            with self.lock:
+                self.inflight = self.new_buffer()
+                self.failing = False
+            return True
+
+    def run(self, interval):
+        while not self.stopped.wait(interval):
+            self.flush()
+
+    def close(self):
+        if not self.stopped.is_set():
+            self.stopped.set()
+            self.flush()
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+def shared(factory, path):
+    # One buffered writer per process, factory and path, shared by all
+    # sessions
+    key = (factory, os.path.abspath(path))
+    with _shared_lock:
+        if key not in _shared:
+            _shared[key] = factory(key[1])
+        return _shared[key]